@@ -4,7 +4,12 @@ PopMart官网库存监控器
 专注监控PopMart官网商品库存状态
 """
 
-from monitors.official_monitor import OfficialMonitor
+from monitors.official_monitor import OfficialMonitor, OfficialCDPMonitor
+from monitors.collection_monitor import CollectionMonitor, CollectionCDPMonitor
+from monitors.config_loader import load_config_file, ConfigWatcher, SETTING_KEYS
+from monitors.webhook_notifier import WebhookNotifier
+from monitors.subscriptions import SubscriptionRegistry, FanoutSender, get_product_key
+from monitors.status_server import StatusServer
 import os
 import sys
 import asyncio
@@ -12,6 +17,7 @@ import argparse
 import logging
 import time
 import discord
+from discord import app_commands
 from dotenv import load_dotenv
 
 # 添加monitors目录到路径
@@ -21,17 +27,44 @@ sys.path.append(os.path.dirname(__file__))
 class PopMartMonitor:
     """PopMart官网库存监控器"""
 
-    def __init__(self, bot_token, verbose_mode=False):
+    def __init__(self, bot_token, verbose_mode=False, config_file=None, webhook_mode=False,
+                 browser_engine='selenium', status_port=None):
         self.bot_token = bot_token
         self.verbose_mode = verbose_mode
-        self.monitors = []
-
-        # 设置Discord客户端
-        intents = discord.Intents.default()
-        intents.message_content = True  # 需要消息内容权限
-        intents.guilds = True  # 需要服务器权限
-        intents.guild_messages = True  # 需要服务器消息权限
-        self.client = discord.Client(intents=intents)
+        self.config_file = config_file
+        self.webhook_mode = webhook_mode
+        self.browser_engine = browser_engine
+        self.status_server = StatusServer(
+            lambda: list(self.monitors.values()) + list(self.listing_monitors.values()),
+            port=status_port) if status_port else None
+        self.monitors = {}  # 商品URL -> 监控器
+        self.listing_monitors = {}  # 列表页URL -> 列表页监控器（分层监控）
+        self.discovered_urls = set()  # 列表页自动发现并加入监控的商品URL
+        self.config_entries = {}  # URL -> 上次加载的配置文件条目，用于热更新时比较变化
+        self.monitor_tasks = {}  # 商品URL -> 监控任务
+        self.background_tasks = set()  # 自动添加商品等后台任务，保留引用直到完成
+        self.watcher_task = None
+        self.running = False
+
+        # 商品订阅表，所有监控器共享同一个限速发送器
+        # Webhook模式没有斜杠命令，也无法向订阅的Discord频道发送，不加载订阅表
+        self.subscriptions = None if webhook_mode else SubscriptionRegistry(
+            os.getenv('SUBSCRIPTIONS_FILE', 'subscriptions.json'))
+        self.fanout_sender = FanoutSender(
+            max_concurrency=int(os.getenv('MONITOR_FANOUT_CONCURRENCY', 5)))
+
+        if webhook_mode:
+            # Webhook模式：不建立Gateway连接，通过Webhook发送通知
+            self.client = WebhookNotifier()
+        else:
+            # 设置Discord客户端
+            intents = discord.Intents.default()
+            intents.message_content = True  # 需要消息内容权限
+            intents.guilds = True  # 需要服务器权限
+            intents.guild_messages = True  # 需要服务器消息权限
+            self.client = discord.Client(intents=intents)
+            self.tree = app_commands.CommandTree(self.client)
+            self.setup_commands()
 
         # 配置日志
         self.setup_logging()
@@ -74,45 +107,441 @@ class PopMartMonitor:
 
             # Cloudflare验证等待时间（秒）
             'cloudflare_wait': int(os.getenv('MONITOR_CLOUDFLARE_WAIT', 10)),
+
+            # 单次检查总时间预算（秒）- 超出后取消本次检查
+            'check_budget': int(os.getenv('MONITOR_CHECK_BUDGET', 60)),
+
+            # 熔断：连续失败次数阈值、初始冷却时间和最大冷却时间（秒）
+            'breaker_threshold': int(os.getenv('MONITOR_BREAKER_THRESHOLD', 3)),
+            'breaker_cooldown': int(os.getenv('MONITOR_BREAKER_COOLDOWN', 30)),
+            'breaker_max_cooldown': int(os.getenv('MONITOR_BREAKER_MAX_COOLDOWN', 600)),
+
+            # 分层监控：商品出现在列表页后的兜底完整检查间隔（秒）
+            'full_check_interval': int(os.getenv('MONITOR_FULL_CHECK_INTERVAL', 600)),
         }
 
+    def create_official_monitor(self, channel_id, product_url, config, locale=None,
+                                keyword_tables=None):
+        """按配置创建PopMart官网监控器"""
+        monitor_class = OfficialCDPMonitor if self.browser_engine == 'cdp' else OfficialMonitor
+        monitor = monitor_class(
+            channel_id=channel_id,
+            product_url=product_url,
+            min_interval=config['min_interval'],
+            max_interval=config['max_interval'],
+            heartbeat_interval=config['heartbeat_interval'],
+            notification_interval=config['notification_interval'],
+            page_load_timeout=config['page_load_timeout'],
+            page_load_wait=config['page_load_wait'],
+            js_render_wait=config['js_render_wait'],
+            cloudflare_wait=config['cloudflare_wait'],
+            verbose_mode=self.verbose_mode,
+            history_size=int(os.getenv('MONITOR_HISTORY_SIZE', 1024)),
+            check_budget=config['check_budget'],
+            breaker_threshold=config['breaker_threshold'],
+            breaker_cooldown=config['breaker_cooldown'],
+            breaker_max_cooldown=config['breaker_max_cooldown'],
+            full_check_interval=config['full_check_interval'],
+            locale=locale,
+            keyword_tables=keyword_tables
+        )
+        monitor.subscriptions = self.subscriptions
+        monitor.fanout_sender = self.fanout_sender
+        return monitor
+
+    def create_listing_monitor(self, channel_id, listing_url, config, locale=None,
+                               keyword_tables=None, auto_add=False):
+        """按配置创建列表页监控器"""
+        monitor_class = CollectionCDPMonitor if self.browser_engine == 'cdp' else CollectionMonitor
+        monitor = monitor_class(
+            channel_id=channel_id,
+            listing_url=listing_url,
+            min_interval=config['min_interval'],
+            max_interval=config['max_interval'],
+            heartbeat_interval=config['heartbeat_interval'],
+            notification_interval=config['notification_interval'],
+            page_load_timeout=config['page_load_timeout'],
+            page_load_wait=config['page_load_wait'],
+            js_render_wait=config['js_render_wait'],
+            cloudflare_wait=config['cloudflare_wait'],
+            verbose_mode=self.verbose_mode,
+            history_size=int(os.getenv('MONITOR_HISTORY_SIZE', 1024)),
+            check_budget=config['check_budget'],
+            breaker_threshold=config['breaker_threshold'],
+            breaker_cooldown=config['breaker_cooldown'],
+            breaker_max_cooldown=config['breaker_max_cooldown'],
+            full_check_interval=config['full_check_interval'],
+            locale=locale,
+            keyword_tables=keyword_tables,
+            auto_add=auto_add,
+            on_sweep=self.handle_listing_sweep,
+            on_coverage_change=self.refresh_listing_coverage
+        )
+        monitor.fanout_sender = self.fanout_sender
+        return monitor
+
+    async def handle_listing_sweep(self, listing, changed_ids, new_ids):
+        """列表页扫描完成：只对库存标记变化的商品和新商品做商品页完整检查"""
+        monitors_by_key = {
+            monitor.product_key: monitor for monitor in self.monitors.values()}
+
+        for spu_id in changed_ids:
+            monitor = monitors_by_key.get(spu_id)
+            if monitor:
+                state_text = "可购买" if listing.availability[spu_id] else "售罄"
+                print(f" 🔔 {spu_id}→{state_text}", end="")
+                monitor.request_check()
+
+        if not new_ids:
+            return
+
+        for spu_id in new_ids:
+            monitor = monitors_by_key.get(spu_id)
+            if monitor:
+                monitor.request_check()
+            elif listing.auto_add and listing.product_urls.get(spu_id):
+                # 在后台创建浏览器，避免占用列表页的检查时间预算
+                task = asyncio.create_task(self.add_discovered_product(
+                    listing, listing.product_urls[spu_id]))
+                self.background_tasks.add(task)
+                task.add_done_callback(self.background_tasks.discard)
+
+        self.send_new_products_alert(listing, new_ids)
+
+    async def add_discovered_product(self, listing, product_url):
+        """将列表页发现的新商品加入监控，立即进行一次完整检查"""
+        if product_url in self.monitors:
+            return
+        try:
+            config = {key: getattr(listing, key) for key in SETTING_KEYS}
+            monitor = self.create_official_monitor(
+                listing.channel_id, product_url, config, listing.locale, listing.keyword_tables)
+            self.monitors[product_url] = monitor
+            self.discovered_urls.add(product_url)
+            self.refresh_listing_coverage()
+            await self.start_monitor(monitor)
+            print(f"\n➕ 已自动添加新商品监控: {monitor.extract_product_name_from_url(product_url)}")
+        except Exception as e:
+            logging.error(f"自动添加新商品监控失败: {product_url} {e}")
+
+    def refresh_listing_coverage(self):
+        """按各列表页最近一次成功扫描重新计算商品是否由列表页驱动
+
+        商品不在任何列表页的最近成功扫描中（商品下架、列表页被移除、扫描失败或熔断）时
+        立即恢复按间隔轮询，列表页出问题时宁可多检查也不漏检查。
+        """
+        covered_ids = set()
+        for listing in self.listing_monitors.values():
+            covered_ids |= listing.covered_product_ids()
+        for monitor in self.monitors.values():
+            monitor.set_listing_driven(monitor.product_key in covered_ids)
+
+    def send_new_products_alert(self, listing, new_ids):
+        """登记发往列表页频道的新商品提醒，列表页检查结束后发送"""
+        lines = []
+        for spu_id in new_ids[:10]:
+            url = listing.product_urls.get(spu_id)
+            state_text = "🟢 可购买" if listing.availability.get(spu_id) else "🔴 售罄"
+            lines.append(f"[{spu_id}]({url}) {state_text}" if url else f"{spu_id} {state_text}")
+        if len(new_ids) > 10:
+            lines.append(f"... 共{len(new_ids)}个新商品")
+
+        embed = discord.Embed(
+            title="🆕 New Product Listed",
+            description="\n".join(lines),
+            color=0x9b59b6
+        )
+        embed.add_field(
+            name="🗂️ Listing",
+            value=f"[{listing.extract_product_name_from_url(listing.product_url)}]({listing.product_url})",
+            inline=False
+        )
+        if listing.auto_add:
+            embed.add_field(name="🤖 Auto Add",
+                            value="新商品已自动加入监控", inline=False)
+        embed.set_footer(
+            text=f"PopMart Monitor by FK_popmart | {time.strftime('%Y-%m-%d %H:%M:%S')}")
+        listing.queue_notification(embed, [(listing.channel_id, None)])
+
+    def find_monitor(self, product_key):
+        """按商品标识查找正在运行的监控器"""
+        for monitor in self.monitors.values():
+            if monitor.product_key == product_key:
+                return monitor
+        return None
+
+    def setup_commands(self):
+        """注册订阅管理的斜杠命令"""
+        @self.tree.command(name="subscribe", description="在当前频道订阅商品库存通知")
+        @app_commands.describe(product="商品URL或spuId", role="有库存时提醒的角色（可选）")
+        @app_commands.default_permissions(manage_channels=True)
+        @app_commands.guild_only()
+        async def subscribe(interaction: discord.Interaction, product: str, role: discord.Role = None):
+            product_key = get_product_key(product)
+            role_id = role.id if role else None
+            is_new = self.subscriptions.subscribe(
+                product_key, interaction.channel_id, role_id)
+
+            message = f"✅ 已订阅商品 `{product_key}`" if is_new else f"🔄 已更新商品 `{product_key}` 的订阅"
+            if role:
+                message += f"，有库存时提醒 {role.mention}"
+            if not self.find_monitor(product_key):
+                message += "\n⚠️ 该商品暂未在监控列表中，加入监控后才会收到通知"
+            await interaction.response.send_message(message, ephemeral=True)
+
+        @self.tree.command(name="unsubscribe", description="取消当前频道的商品库存通知")
+        @app_commands.describe(product="商品URL或spuId")
+        @app_commands.default_permissions(manage_channels=True)
+        @app_commands.guild_only()
+        async def unsubscribe(interaction: discord.Interaction, product: str):
+            product_key = get_product_key(product)
+            if self.subscriptions.unsubscribe(product_key, interaction.channel_id):
+                await interaction.response.send_message(f"✅ 已取消订阅商品 `{product_key}`", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"❌ 当前频道未订阅商品 `{product_key}`", ephemeral=True)
+
+        @self.tree.command(name="subscriptions", description="查看当前频道订阅的商品")
+        @app_commands.guild_only()
+        async def subscriptions(interaction: discord.Interaction):
+            entries = self.subscriptions.get_channel_subscriptions(
+                interaction.channel_id)
+            if not entries:
+                await interaction.response.send_message("📭 当前频道没有订阅任何商品", ephemeral=True)
+                return
+
+            lines = []
+            for product_key, role_id in entries:
+                monitor = self.find_monitor(product_key)
+                name = monitor.extract_product_name_from_url(
+                    monitor.product_url) if monitor else "未在监控中"
+                role_text = f" → <@&{role_id}>" if role_id else ""
+                lines.append(f"• `{product_key}` {name}{role_text}")
+            await interaction.response.send_message("📋 当前频道订阅:\n" + "\n".join(lines), ephemeral=True)
+
+        @self.tree.command(name="status", description="查看最近的检查统计和库存状态变化")
+        @app_commands.describe(product="商品URL或spuId（可选，默认全部）", minutes="统计最近多少分钟（默认60）")
+        async def status(interaction: discord.Interaction, product: str = None,
+                         minutes: app_commands.Range[int, 1, 1440] = 60):
+            monitors = list(self.monitors.values())
+            if product:
+                monitor = self.find_monitor(get_product_key(product))
+                monitors = [monitor] if monitor else []
+            if not monitors:
+                await interaction.response.send_message("❌ 没有匹配的监控商品", ephemeral=True)
+                return
+
+            embed = discord.Embed(
+                title=f"📊 最近{minutes}分钟检查统计", color=0x4ecdc4)
+            for monitor in monitors[:25]:
+                embed.add_field(
+                    name=f"📦 {monitor.extract_product_name_from_url(monitor.product_url)}",
+                    value=self.format_status(monitor.get_status(minutes * 60)),
+                    inline=False)
+            embed.set_footer(
+                text=f"PopMart Monitor by FK_popmart | {time.strftime('%Y-%m-%d %H:%M:%S')}")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    def format_status(self, status):
+        """将监控状态格式化为Discord消息文本"""
+        state_icons = {'in_stock': '🟢', 'sold_out': '🔴', 'unknown': '⚪'}
+        latency = status['latency']
+        if not status['checks']:
+            return "暂无检查记录"
+
+        lines = [
+            f"{state_icons[status['stock_state']]} 当前: {status['stock_state']} | 检查 {status['checks']} 次 | 成功率 {status['success_rate']:.0%}",
+            f"⏱️ 耗时 p50 {latency['p50']}s / p90 {latency['p90']}s / p99 {latency['p99']}s",
+        ]
+        breaker = status['circuit_breaker']
+        if breaker['state'] != 'closed':
+            lines.append(
+                f"⛔ 熔断: {breaker['state']} | 连续失败 {breaker['consecutive_failures']} 次 | 剩余冷却 {breaker['remaining_cooldown']:.0f}s")
+        if status['errors']:
+            lines.append("⚠️ 错误: " + ", ".join(
+                f"{name}×{count}" for name, count in status['errors'].items()))
+        timeline = " → ".join(
+            f"{state_icons.get(entry['state'], '⚪')}{entry['time'][11:16]}"
+            for entry in status['timeline'][-8:])
+        lines.append(f"🕒 {timeline}")
+        return "\n".join(lines)[:1024]
+
+    async def sync_commands(self):
+        """同步斜杠命令到所有服务器（按服务器同步可立即生效）"""
+        for guild in self.client.guilds:
+            try:
+                self.tree.copy_global_to(guild=guild)
+                await self.tree.sync(guild=guild)
+            except Exception as e:
+                print(f"❌ 斜杠命令同步失败 (服务器: {guild.name}): {e}")
+
+    def register_webhook(self, channel_id, webhook_url):
+        """Webhook模式下登记频道对应的Webhook URL"""
+        if not self.webhook_mode:
+            return
+        if not webhook_url:
+            raise ValueError(f"Webhook模式下频道 {channel_id} 缺少webhook_url")
+        self.client.register(channel_id, webhook_url)
+
     def add_official_monitor(self):
         """添加PopMart官网监控器"""
         try:
-            channel_id = int(os.getenv('OFFICIAL_CHANNEL_ID'))
+            webhook_url = os.getenv('OFFICIAL_WEBHOOK_URL')
+            if self.webhook_mode and not os.getenv('OFFICIAL_CHANNEL_ID'):
+                channel_id = webhook_url
+            else:
+                channel_id = int(os.getenv('OFFICIAL_CHANNEL_ID'))
             product_url = os.getenv('OFFICIAL_PRODUCT_URL')
             config = self.get_unified_config()
-
-            monitor = OfficialMonitor(
-                channel_id=channel_id,
-                product_url=product_url,
-                min_interval=config['min_interval'],
-                max_interval=config['max_interval'],
-                heartbeat_interval=config['heartbeat_interval'],
-                notification_interval=config['notification_interval'],
-                page_load_timeout=config['page_load_timeout'],
-                page_load_wait=config['page_load_wait'],
-                js_render_wait=config['js_render_wait'],
-                cloudflare_wait=config['cloudflare_wait'],
-                verbose_mode=self.verbose_mode
-            )
-
-            self.monitors.append(monitor)
-            print(f"✅ PopMart官网监控器已添加 - 频道ID: {channel_id}")
+            self.register_webhook(channel_id, webhook_url)
+
+            # 只配置列表页时不创建商品监控器，由列表页发现新商品
+            if product_url:
+                monitor = self.create_official_monitor(
+                    channel_id, product_url, config)
+
+                self.monitors[product_url] = monitor
+                print(f"✅ PopMart官网监控器已添加 - 频道ID: {channel_id}")
+
+            # 分层监控的列表页（多个URL用逗号分隔）
+            listing_urls = [url.strip() for url in os.getenv(
+                'OFFICIAL_LISTING_URLS', '').split(',') if url.strip()]
+            auto_add = os.getenv(
+                'OFFICIAL_LISTING_AUTO_ADD', '').lower() == 'true'
+            for listing_url in listing_urls:
+                self.listing_monitors[listing_url] = self.create_listing_monitor(
+                    channel_id, listing_url, config, auto_add=auto_add)
+            if listing_urls:
+                print(f"✅ 分层监控已启用 - {len(listing_urls)}个列表页")
 
         except Exception as e:
             print(f"❌ 添加PopMart官网监控器失败: {e}")
 
+    def load_config_products(self):
+        """从配置文件添加商品监控器"""
+        try:
+            _, products, listings = load_config_file(
+                self.config_file, self.get_unified_config())
+            for entry in products + listings:
+                self.register_webhook(
+                    entry['channel_id'], entry['webhook_url'])
+            for product in products:
+                self.monitors[product['url']] = self.create_product_from_entry(
+                    product)
+            for listing in listings:
+                self.listing_monitors[listing['url']] = self.create_listing_from_entry(
+                    listing)
+            self.config_entries = {
+                entry['url']: entry for entry in products + listings}
+            print(
+                f"✅ 已从配置文件加载 {len(products)} 个商品、{len(listings)} 个列表页 - {self.config_file}")
+        except Exception as e:
+            print(f"❌ 读取配置文件失败: {e}")
+
+    def create_product_from_entry(self, entry):
+        """按配置文件条目创建商品监控器"""
+        return self.create_official_monitor(
+            entry['channel_id'], entry['url'], entry['settings'],
+            entry['locale'], entry['keyword_tables'])
+
+    def create_listing_from_entry(self, entry):
+        """按配置文件条目创建列表页监控器"""
+        return self.create_listing_monitor(
+            entry['channel_id'], entry['url'], entry['settings'],
+            entry['locale'], entry['keyword_tables'], entry['auto_add'])
+
+    async def reload_config(self):
+        """重新加载配置文件，仅改动发生变化的商品和列表页"""
+        _, products, listings = load_config_file(
+            self.config_file, self.get_unified_config())
+        for entry in products + listings:
+            self.register_webhook(
+                entry['channel_id'], entry['webhook_url'])
+
+        # 配置文件中明确列出的商品不再视为自动发现
+        self.discovered_urls -= {product['url'] for product in products}
+
+        await self.sync_monitors(
+            self.monitors, products, self.create_product_from_entry, "商品")
+        await self.sync_monitors(
+            self.listing_monitors, listings, self.create_listing_from_entry, "列表页")
+
+        # 被移除的列表页不再驱动商品检查
+        self.refresh_listing_coverage()
+
+        print(
+            f"✅ 配置已重新加载，当前监控 {len(self.monitors)} 个商品、{len(self.listing_monitors)} 个列表页")
+
+    async def sync_monitors(self, monitors, entries, create_monitor, label):
+        """按配置条目增删或原地更新监控器"""
+        entry_urls = {entry['url'] for entry in entries}
+
+        # 移除的条目：停止监控并释放浏览器（列表页自动发现的商品保留）
+        for url in list(monitors):
+            if url not in entry_urls and url not in self.discovered_urls:
+                monitor = monitors.pop(url)
+                self.config_entries.pop(url, None)
+                await self.stop_monitor(url)
+                print(f"➖ 已移除{label}监控: {monitor.extract_product_name_from_url(url)}")
+
+        for entry in entries:
+            monitor = monitors.get(entry['url'])
+            previous = self.config_entries.get(entry['url'])
+            self.config_entries[entry['url']] = entry
+            if monitor and previous == entry:
+                # 未变化的条目：不做任何改动，避免所有商品同时被唤醒检查
+                continue
+            if monitor:
+                # 修改的条目：原地更新参数，浏览器和状态不变
+                await monitor.apply_settings(entry['channel_id'], entry['settings'])
+                monitor.apply_keywords(entry['locale'], entry['keyword_tables'])
+                if hasattr(monitor, 'auto_add'):
+                    monitor.auto_add = entry['auto_add']
+            else:
+                # 新增的条目：分配浏览器并开始监控
+                monitor = create_monitor(entry)
+                monitors[entry['url']] = monitor
+                await self.start_monitor(monitor)
+                print(f"➕ 已添加{label}监控: {monitor.extract_product_name_from_url(entry['url'])}")
+
+    async def start_monitor(self, monitor):
+        """为监控器设置浏览器驱动并启动监控任务"""
+        if not await monitor.setup_driver():
+            print(f"❌ {monitor.platform_name}浏览器驱动初始化失败")
+
+        self.monitor_tasks[monitor.product_url] = asyncio.create_task(
+            monitor.monitor_loop(self.client))
+
+    async def stop_monitor(self, product_url):
+        """停止监控任务，任务退出时会清理浏览器驱动"""
+        task = self.monitor_tasks.pop(product_url, None)
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
     async def send_startup_notifications(self):
         """发送启动通知"""
         mode_text = "Verbose模式" if self.verbose_mode else "正常模式"
 
+        if self.webhook_mode:
+            for monitor in self.monitors.values():
+                channel = self.client.get_channel(monitor.channel_id)
+                product_name = monitor.extract_product_name_from_url(
+                    monitor.product_url)
+                if channel and await channel.send(f"🤖 {monitor.platform_name}监控启动 | {product_name} | {mode_text}"):
+                    print(f"✅ {monitor.platform_name}启动通知已发送 (Webhook)")
+                else:
+                    print(f"❌ {monitor.platform_name}启动通知发送失败 (Webhook)")
+            return
+
         print(
             f"🔍 Discord客户端状态: {'已连接' if not self.client.is_closed() else '未连接'}")
         print(f"🔍 当前用户: {self.client.user}")
         print(f"🔍 服务器数量: {len(self.client.guilds)}")
 
-        for monitor in self.monitors:
+        for monitor in self.monitors.values():
             try:
                 print(f"🔍 尝试获取频道ID: {monitor.channel_id}")
                 channel = self.client.get_channel(monitor.channel_id)
@@ -147,7 +576,8 @@ class PopMartMonitor:
 
     async def run_monitors(self):
         """运行所有监控器"""
-        if not self.monitors:
+        # 使用配置文件时即使暂时没有监控器也继续运行，等待热更新添加
+        if not self.monitors and not self.listing_monitors and not self.config_file:
             print("❌ 没有配置任何监控器")
             return
 
@@ -158,37 +588,81 @@ class PopMartMonitor:
         # 发送启动通知
         await self.send_startup_notifications()
 
-        # 为每个监控器设置浏览器驱动
-        for monitor in self.monitors:
-            if not monitor.setup_driver():
-                print(f"❌ {monitor.platform_name}浏览器驱动初始化失败")
-                continue
-
         print(f"🔄 开始并发监控...")
         print("=" * 80)
 
-        # 并发运行所有监控器
-        tasks = []
-        for monitor in self.monitors:
-            task = asyncio.create_task(monitor.monitor_loop(self.client))
-            tasks.append(task)
+        # 为每个监控器设置浏览器驱动并并发运行
+        await asyncio.gather(*(self.start_monitor(monitor)
+                               for monitor in list(self.monitors.values()) +
+                               list(self.listing_monitors.values())))
+
+        # 启动本地状态接口
+        if self.status_server:
+            try:
+                await self.status_server.start()
+                print(f"📈 状态接口: http://{self.status_server.host}:{self.status_server.port}/status")
+            except Exception as e:
+                print(f"❌ 状态接口启动失败: {e}")
+
+        # 监视配置文件，变化时热更新
+        if self.config_file:
+            watcher = ConfigWatcher(self.config_file, self.reload_config)
+            self.watcher_task = asyncio.create_task(watcher.watch(self.client))
+            print(f"👀 正在监视配置文件: {self.config_file}")
 
         try:
             # 等待所有任务完成（通常不会完成，除非出错）
-            await asyncio.gather(*tasks)
+            while not self.client.is_closed():
+                pending = [task for task in self.monitor_tasks.values()
+                           if not task.done()]
+                if self.watcher_task and not self.watcher_task.done():
+                    pending.append(self.watcher_task)
+                if not pending:
+                    break
+                await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
         except Exception as e:
             print(f"❌ 监控出错: {e}")
         finally:
             # 清理所有驱动
-            for monitor in self.monitors:
-                monitor.cleanup_driver()
+            if self.watcher_task:
+                self.watcher_task.cancel()
+            for task in list(self.background_tasks):
+                task.cancel()
+            if self.status_server:
+                await self.status_server.stop()
+            for product_url in list(self.monitor_tasks):
+                await self.stop_monitor(product_url)
+            for monitor in list(self.monitors.values()) + list(self.listing_monitors.values()):
+                await monitor.cleanup_driver()
             await self.client.close()
 
+    async def start_webhook(self):
+        """Webhook模式启动：无需等待on_ready，立即开始检查"""
+        try:
+            await self.client.start()
+            await self.run_monitors()
+        except Exception as e:
+            print(f"❌ 程序运行出错: {e}")
+        finally:
+            await self.client.close()
+            for monitor in list(self.monitors.values()) + list(self.listing_monitors.values()):
+                await monitor.cleanup_driver()
+            print("👋 PopMart监控程序已退出")
+
     async def start(self):
         """启动监控器"""
+        if self.webhook_mode:
+            await self.start_webhook()
+            return
+
         @self.client.event
         async def on_ready():
             """Discord客户端准备就绪"""
+            # 断线重连时会再次触发on_ready，避免重复启动监控
+            if self.running:
+                return
+            self.running = True
+            await self.sync_commands()
             await self.run_monitors()
 
         # 启动Discord客户端
@@ -200,8 +674,8 @@ class PopMartMonitor:
             print(f"❌ 程序运行出错: {e}")
         finally:
             # 清理所有驱动
-            for monitor in self.monitors:
-                monitor.cleanup_driver()
+            for monitor in list(self.monitors.values()) + list(self.listing_monitors.values()):
+                await monitor.cleanup_driver()
             print("👋 PopMart监控程序已退出")
 
 
@@ -218,8 +692,38 @@ def parse_arguments():
 示例:
   python monitor.py                    # 正常模式监控
   python monitor.py --verbose          # 详细模式监控
+  python monitor.py -c monitor.toml    # 从配置文件加载商品（支持热更新）
+  python monitor.py --webhook          # Webhook模式，无需BOT_TOKEN
+  python monitor.py --engine cdp       # 使用CDP异步浏览器引擎
         """)
 
+    parser.add_argument(
+        '--config', '-c',
+        default=os.getenv('MONITOR_CONFIG_FILE'),
+        help='商品配置文件（TOML），修改后自动热更新，无需重启'
+    )
+
+    parser.add_argument(
+        '--webhook',
+        action='store_true',
+        default=os.getenv('NOTIFIER_BACKEND', '').lower() == 'webhook',
+        help='使用Discord Webhook发送通知，不建立机器人Gateway连接'
+    )
+
+    parser.add_argument(
+        '--engine',
+        choices=['selenium', 'cdp'],
+        default=os.getenv('MONITOR_BROWSER_ENGINE', 'selenium').lower(),
+        help='浏览器引擎: selenium（默认）或 cdp（Playwright异步驱动，多页面共享一个Chrome）'
+    )
+
+    parser.add_argument(
+        '--status-port',
+        type=int,
+        default=int(os.getenv('MONITOR_STATUS_PORT', 0)) or None,
+        help='在本机该端口提供JSON状态接口（http://127.0.0.1:端口/status）'
+    )
+
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -239,15 +743,21 @@ def main():
 
     # 检查BOT_TOKEN
     bot_token = os.getenv('BOT_TOKEN')
-    if not bot_token:
+    if not bot_token and not args.webhook:
         print("❌ 错误: 未找到BOT_TOKEN，请检查.env文件")
         return
 
     # 创建PopMart监控器
-    monitor = PopMartMonitor(bot_token, verbose_mode=args.verbose)
+    monitor = PopMartMonitor(
+        bot_token, verbose_mode=args.verbose, config_file=args.config,
+        webhook_mode=args.webhook, browser_engine=args.engine,
+        status_port=args.status_port)
 
     # 添加PopMart官网监控器
-    monitor.add_official_monitor()
+    if args.config:
+        monitor.load_config_products()
+    else:
+        monitor.add_official_monitor()
 
     # 显示启动信息
     mode_info = "🔍 Verbose模式 (每次检查都通知)" if args.verbose else "🎯 正常模式 (有库存时持续通知)"
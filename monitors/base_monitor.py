@@ -2,19 +2,49 @@ import asyncio
 import random
 import time
 import logging
+import discord
 from abc import ABC, abstractmethod
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
+from .subscriptions import FanoutSender, get_product_key
+from .check_history import (CheckHistory, ERROR_NONE, ERROR_TIMEOUT, ERROR_BROWSER,
+                            ERROR_DRIVER_SETUP, ERROR_BUDGET_EXCEEDED, STATE_UNKNOWN,
+                            STATE_SOLD_OUT, STATE_IN_STOCK, STATE_NAMES)
+from .circuit_breaker import CircuitBreaker, STATE_HALF_OPEN
+
+
+# 随机用户代理
+USER_AGENTS = [
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
+]
+
+# 计入熔断的错误：页面卡住或浏览器异常
+BREAKER_ERRORS = (ERROR_TIMEOUT, ERROR_BROWSER,
+                  ERROR_DRIVER_SETUP, ERROR_BUDGET_EXCEEDED)
 
 
 class BaseMonitor(ABC):
-    """基础监控类，定义所有监控器的通用接口和功能"""
+    """基础监控类，定义所有监控器的通用接口和功能
+
+    默认使用Selenium驱动Chrome，阻塞的WebDriver调用在线程池中执行。
+    其他浏览器引擎通过覆盖setup_driver/cleanup_driver和页面操作方法接入。
+    """
+
+    # 页面加载超时和浏览器错误对应的异常类型，由浏览器引擎决定
+    timeout_errors = (TimeoutException,)
+    browser_errors = (WebDriverException,)
 
     def __init__(self, platform_name, channel_id, product_url, min_interval, max_interval,
                  heartbeat_interval, notification_interval, page_load_timeout=25,
-                 page_load_wait=3, js_render_wait=5, cloudflare_wait=10, verbose_mode=False):
+                 page_load_wait=3, js_render_wait=5, cloudflare_wait=10, verbose_mode=False,
+                 history_size=1024, check_budget=60, breaker_threshold=3, breaker_cooldown=30,
+                 breaker_max_cooldown=600, full_check_interval=600):
         self.platform_name = platform_name
         self.channel_id = channel_id
         self.product_url = product_url
@@ -27,6 +57,11 @@ class BaseMonitor(ABC):
         self.js_render_wait = js_render_wait
         self.cloudflare_wait = cloudflare_wait
         self.verbose_mode = verbose_mode
+        self.check_budget = check_budget
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.breaker_max_cooldown = breaker_max_cooldown
+        self.full_check_interval = full_check_interval
 
         # 状态跟踪
         self.last_stock_status = None
@@ -34,6 +69,28 @@ class BaseMonitor(ABC):
         self.last_stock_notification_time = 0
         self.driver = None
 
+        # 最近检查记录（固定大小的环形缓冲区）
+        self.history = CheckHistory(history_size)
+        self.check_error = ERROR_NONE
+
+        # 本次检查登记的通知 [(通知目标, embed)]，在检查时间预算之外发送
+        self.pending_notifications = []
+
+        # 熔断器：连续超时或浏览器错误时暂停检查该商品
+        self.circuit_breaker = CircuitBreaker(
+            breaker_threshold, breaker_cooldown, breaker_max_cooldown)
+
+        # 订阅频道（由主程序注入共享的订阅表和发送器）
+        self.product_key = get_product_key(product_url)
+        self.subscriptions = None
+        self.fanout_sender = FanoutSender()
+
+        # 配置变化或列表页发现变化时用于提前结束等待
+        self.wake_event = asyncio.Event()
+
+        # 分层监控：商品出现在列表页最近一次成功扫描中时，只在列表页状态变化时完整检查
+        self.listing_driven = False
+
         # 配置日志
         self.setup_logging()
 
@@ -45,8 +102,12 @@ class BaseMonitor(ABC):
         logging.getLogger('urllib3').setLevel(logging.WARNING)
         logging.getLogger('WDM').setLevel(logging.WARNING)
 
-    def setup_driver(self):
+    async def setup_driver(self):
         """设置Chrome驱动"""
+        return await asyncio.to_thread(self.create_driver)
+
+    def create_driver(self):
+        """创建Chrome驱动（阻塞调用）"""
         try:
             options = Options()
 
@@ -67,17 +128,13 @@ class BaseMonitor(ABC):
             options.add_experimental_option('useAutomationExtension', False)
 
             # 随机用户代理
-            user_agents = [
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
-            ]
-            selected_ua = random.choice(user_agents)
+            selected_ua = random.choice(USER_AGENTS)
             options.add_argument(f'--user-agent={selected_ua}')
 
             # 设置服务
             service = Service(ChromeDriverManager().install())
             self.driver = webdriver.Chrome(service=service, options=options)
+            self.driver.set_page_load_timeout(self.page_load_timeout)
 
             # 执行反检测脚本
             self.driver.execute_script(
@@ -90,16 +147,100 @@ class BaseMonitor(ABC):
             logging.error(f"{self.platform_name}浏览器驱动设置失败: {e}")
             return False
 
-    def cleanup_driver(self):
+    async def cleanup_driver(self):
         """清理驱动"""
         if self.driver:
+            driver = self.driver
+            self.driver = None
             try:
-                self.driver.quit()
+                await asyncio.to_thread(driver.quit)
             except:
                 pass
-            self.driver = None
             logging.info(f"{self.platform_name}浏览器驱动已清理")
 
+    async def load_page(self, url):
+        """打开页面"""
+        await asyncio.to_thread(self.driver.get, url)
+
+    async def wait_for_page_ready(self, timeout):
+        """等待页面加载完成"""
+        def wait():
+            WebDriverWait(self.driver, timeout).until(
+                lambda d: d.execute_script(
+                    "return document.readyState") == "complete"
+            )
+        await asyncio.to_thread(wait)
+
+    async def get_page_title(self):
+        """获取页面标题"""
+        return await asyncio.to_thread(lambda: self.driver.title)
+
+    async def refresh_page(self):
+        """刷新页面"""
+        await asyncio.to_thread(self.driver.refresh)
+
+    async def get_page_source(self):
+        """获取页面源码"""
+        return await asyncio.to_thread(lambda: self.driver.page_source)
+
+    async def find_element_texts(self, by, selector):
+        """获取所有匹配元素的文本"""
+        def find():
+            return [element.text.strip()
+                    for element in self.driver.find_elements(by, selector)]
+        return await asyncio.to_thread(find)
+
+    async def find_element_attributes(self, by, selector, attribute):
+        """获取所有匹配元素的属性值"""
+        def find():
+            return [element.get_attribute(attribute)
+                    for element in self.driver.find_elements(by, selector)]
+        return await asyncio.to_thread(find)
+
+    async def execute_script(self, script):
+        """在页面中执行脚本（函数体，用return返回结果）"""
+        return await asyncio.to_thread(self.driver.execute_script, script)
+
+    async def set_page_load_timeout(self, timeout):
+        """更新已创建浏览器的页面加载超时"""
+        await asyncio.to_thread(self.driver.set_page_load_timeout, timeout)
+
+    async def apply_settings(self, channel_id, settings):
+        """热更新监控参数，浏览器和库存状态保持不变"""
+        previous_timeout = self.page_load_timeout
+        self.channel_id = channel_id
+        for key, value in settings.items():
+            setattr(self, key, value)
+        self.circuit_breaker.failure_threshold = self.breaker_threshold
+        self.circuit_breaker.cooldown = self.breaker_cooldown
+        self.circuit_breaker.max_cooldown = self.breaker_max_cooldown
+
+        # 浏览器的页面加载超时只在创建时设置，参数变化时同步到正在运行的浏览器
+        if self.driver and self.page_load_timeout != previous_timeout:
+            try:
+                await self.set_page_load_timeout(self.page_load_timeout)
+            except Exception as e:
+                logging.warning(f"{self.platform_name}页面加载超时更新失败: {e}")
+        # 唤醒等待中的监控循环，使新的检查间隔立即生效
+        self.wake_event.set()
+
+    def request_check(self):
+        """请求立即进行一次完整检查（分层监控中由列表页扫描触发）"""
+        self.wake_event.set()
+
+    def set_listing_driven(self, listing_driven):
+        """切换列表页驱动模式：驱动时仅在被请求或兜底间隔到期时检查，退出时立即恢复按间隔轮询"""
+        if self.listing_driven and not listing_driven:
+            self.wake_event.set()
+        self.listing_driven = listing_driven
+
+    async def wait_interval(self, wait_time):
+        """等待检查间隔，参数更新或请求检查时提前结束"""
+        try:
+            await asyncio.wait_for(self.wake_event.wait(), timeout=wait_time)
+        except asyncio.TimeoutError:
+            pass
+
     @abstractmethod
     async def check_stock_and_notify(self, client):
         """检查库存并通知 - 子类必须实现"""
@@ -116,23 +257,157 @@ class BaseMonitor(ABC):
 
         try:
             while not client.is_closed():
+                # 熔断期间跳过检查，等待冷却结束
+                if not self.circuit_breaker.allow_request():
+                    self.wake_event.clear()
+                    await self.wait_interval(
+                        self.circuit_breaker.remaining_cooldown())
+                    continue
+
                 check_count += 1
                 current_time = time.strftime('%H:%M:%S')
                 print(
                     f"\n📊 [{self.platform_name}] #{check_count} [{current_time}]", end="")
+                if self.circuit_breaker.state == STATE_HALF_OPEN:
+                    print(" 🔁 熔断试探", end="")
+
+                # 检查开始后到来的请求会在下一轮等待时立即生效
+                self.wake_event.clear()
+                self.check_error = ERROR_NONE
+                self.pending_notifications = []
+                started = time.time()
+                try:
+                    # 单次检查总时间预算，超时取消卡住的页面操作
+                    await asyncio.wait_for(self.check_stock_and_notify(client),
+                                           timeout=self.check_budget)
+                except asyncio.TimeoutError:
+                    print(f" ⏱️ 超出检查时间预算{self.check_budget}s，已取消", end="")
+                    self.check_error = ERROR_BUDGET_EXCEEDED
+                    # 关闭浏览器以中断仍在进行的页面操作，下次检查时重新创建
+                    await self.cleanup_driver()
+                duration = time.time() - started
+
+                # 通知在预算之外发送：限流重试和频道间隔不会被取消，也不计入熔断
+                await self.send_pending_notifications(client)
+                self.record_check(started, duration)
+                await self.update_circuit_breaker(client)
 
-                await self.check_stock_and_notify(client)
+                if self.listing_driven:
+                    # 列表页驱动：等待列表页状态变化，兜底间隔到期时也完整检查一次
+                    print(f" 💤 等待列表页变化（最长{self.full_check_interval}s）...")
+                    await self.wait_interval(self.full_check_interval)
+                    continue
 
                 # 随机等待时间
                 wait_time = random.uniform(
                     self.min_interval, self.max_interval)
                 print(f" ⏰ 等待{wait_time:.1f}s...")
-                await asyncio.sleep(wait_time)
+                await self.wait_interval(wait_time)
 
         except Exception as e:
             logging.error(f"{self.platform_name}监控循环出错: {e}")
         finally:
-            self.cleanup_driver()
+            await self.cleanup_driver()
+
+    def record_check(self, started, duration):
+        """记录本次检查结果"""
+        if self.check_error != ERROR_NONE:
+            stock_state = STATE_UNKNOWN
+        elif self.current_stock_status:
+            stock_state = STATE_IN_STOCK
+        else:
+            stock_state = STATE_SOLD_OUT
+        self.history.record(started, duration, stock_state, self.check_error)
+
+    async def update_circuit_breaker(self, client):
+        """根据本次检查结果更新熔断器，状态变化时记录日志并发送提醒"""
+        breaker = self.circuit_breaker
+        product_name = self.extract_product_name_from_url(self.product_url)
+
+        if self.check_error in BREAKER_ERRORS:
+            if not breaker.record_failure():
+                return
+            print(f" ⛔ 熔断{breaker.current_cooldown}s", end="")
+            logging.warning(
+                f"{self.platform_name}熔断: {product_name} 连续失败{breaker.consecutive_failures}次，暂停检查{breaker.current_cooldown}s")
+            # 释放卡住的浏览器，冷却结束后重新创建
+            await self.cleanup_driver()
+            # 只在首次熔断时提醒，试探失败后的再次熔断仅记录日志
+            if breaker.trip_count == 1:
+                await self.send_breaker_alert(client, product_name, tripped=True)
+        elif self.check_error != ERROR_NONE:
+            # 页面异常（如Cloudflare拦截）等错误不计入熔断，但也不算检查成功，熔断状态保持不变
+            return
+        elif breaker.record_success():
+            logging.info(f"{self.platform_name}熔断恢复: {product_name}")
+            await self.send_breaker_alert(client, product_name, tripped=False)
+
+    async def send_breaker_alert(self, client, product_name, tripped):
+        """向主频道发送熔断/恢复提醒"""
+        breaker = self.circuit_breaker
+        if tripped:
+            embed = discord.Embed(
+                title="⛔ Monitor Paused",
+                description=f"**{product_name}** 连续{breaker.consecutive_failures}次检查失败（页面超时或浏览器错误），暂停检查 {breaker.current_cooldown}s。",
+                color=0xf39c12
+            )
+        else:
+            embed = discord.Embed(
+                title="✅ Monitor Recovered",
+                description=f"**{product_name}** 已恢复正常检查。",
+                color=0x2ecc71
+            )
+        embed.add_field(name="🔌 Circuit Breaker",
+                        value=breaker.state, inline=True)
+        embed.add_field(name="🛒 Product",
+                        value=f"[Product Link]({self.product_url})", inline=True)
+        embed.set_footer(
+            text=f"PopMart Monitor by FK_popmart | {time.strftime('%Y-%m-%d %H:%M:%S')}")
+        await self.fanout_sender.send(client, [(self.channel_id, None)], embed)
+
+    def get_status(self, window=3600):
+        """获取监控状态和最近window秒的检查统计"""
+        latest = self.history.latest()
+        return {
+            'product': self.extract_product_name_from_url(self.product_url),
+            'product_key': self.product_key,
+            'url': self.product_url,
+            'platform': self.platform_name,
+            'last_check': latest.to_dict() if latest else None,
+            'stock_state': STATE_NAMES[STATE_IN_STOCK if self.last_stock_status else STATE_SOLD_OUT]
+            if self.last_stock_status is not None else STATE_NAMES[STATE_UNKNOWN],
+            'circuit_breaker': self.circuit_breaker.get_status(),
+            **self.history.summary(window),
+        }
+
+    def get_notification_targets(self):
+        """获取通知目标 [(频道ID, 提醒内容)]：主频道@here，订阅频道提醒对应角色
+
+        同一频道只发送一次，该频道所有订阅的角色提醒合并到同一条消息中。
+        """
+        mentions = {self.channel_id: ["@here"]}
+        if self.subscriptions:
+            for subscriber in self.subscriptions.get_subscribers(self.product_key):
+                channel_mentions = mentions.setdefault(subscriber['channel_id'], [])
+                mention = f"<@&{subscriber['role_id']}>" if subscriber['role_id'] else None
+                if mention and mention not in channel_mentions:
+                    channel_mentions.append(mention)
+        return [(channel_id, " ".join(channel_mentions) or None)
+                for channel_id, channel_mentions in mentions.items()]
+
+    def queue_notification(self, embed, targets=None):
+        """登记通知，默认发送到主频道和所有订阅频道，检查结束后统一发送"""
+        if targets is None:
+            targets = self.get_notification_targets()
+        self.pending_notifications.append((targets, embed))
+
+    async def send_pending_notifications(self, client):
+        """将登记的通知并发发送到所有目标频道"""
+        pending, self.pending_notifications = self.pending_notifications, []
+        for targets, embed in pending:
+            sent_count = await self.fanout_sender.send(client, targets, embed)
+            if len(targets) > 1:
+                print(f" 📨 {sent_count}/{len(targets)}个频道", end="")
 
     def should_notify(self):
         """判断是否应该发送通知"""
@@ -0,0 +1,177 @@
+import asyncio
+import random
+import logging
+from selenium.webdriver.common.by import By
+from .base_monitor import USER_AGENTS
+
+try:
+    from playwright.async_api import async_playwright
+    from playwright.async_api import Error as PlaywrightError
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+except ImportError:
+    # Playwright为可选依赖，仅CDP引擎需要
+    async_playwright = None
+
+    class PlaywrightError(Exception):
+        pass
+
+    class PlaywrightTimeoutError(PlaywrightError):
+        pass
+
+
+class CDPBrowserPool:
+    """共享的Chrome进程，所有监控器各自使用独立的上下文和页面"""
+
+    def __init__(self):
+        self.playwright = None
+        self.browser = None
+        self.users = 0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """获取共享浏览器，首次调用时启动Chrome"""
+        async with self.lock:
+            if self.browser is None or not self.browser.is_connected():
+                if self.playwright is None:
+                    self.playwright = await async_playwright().start()
+                self.browser = await self.playwright.chromium.launch(
+                    headless=True,
+                    args=[
+                        '--no-sandbox',
+                        '--disable-dev-shm-usage',
+                        '--disable-gpu',
+                        '--disable-blink-features=AutomationControlled',
+                        '--disable-extensions',
+                    ])
+                logging.info("CDP共享浏览器已启动")
+            self.users += 1
+            return self.browser
+
+    async def release(self):
+        """释放共享浏览器，没有使用者时关闭Chrome"""
+        async with self.lock:
+            self.users = max(self.users - 1, 0)
+            if self.users:
+                return
+            try:
+                if self.browser:
+                    await self.browser.close()
+                if self.playwright:
+                    await self.playwright.stop()
+            except Exception:
+                pass
+            self.browser = None
+            self.playwright = None
+            logging.info("CDP共享浏览器已关闭")
+
+
+browser_pool = CDPBrowserPool()
+
+
+class CDPBrowserMixin:
+    """通过DevTools协议（Playwright异步API）驱动Chrome的浏览器引擎
+
+    与BaseMonitor的Selenium实现接口相同，所有页面操作都是原生协程，
+    多个监控器的导航、等待和页面内求值可以在同一事件循环中并发执行。
+    """
+
+    timeout_errors = (PlaywrightTimeoutError,)
+    browser_errors = (PlaywrightError,)
+
+    async def setup_driver(self):
+        """创建独立的浏览器上下文和页面"""
+        if async_playwright is None:
+            logging.error(
+                f"{self.platform_name}浏览器驱动设置失败: 未安装playwright，请执行 pip install playwright && playwright install chromium")
+            return False
+
+        try:
+            browser = await browser_pool.acquire()
+            self.browser_context = None
+            try:
+                self.browser_context = await browser.new_context(
+                    user_agent=random.choice(USER_AGENTS),
+                    viewport={'width': 1920, 'height': 1080})
+                # 执行反检测脚本
+                await self.browser_context.add_init_script(
+                    "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+                self.driver = await self.browser_context.new_page()
+            except Exception:
+                # 上下文已创建但页面创建失败时先关闭上下文，避免泄漏
+                if self.browser_context:
+                    try:
+                        await self.browser_context.close()
+                    except Exception:
+                        pass
+                    self.browser_context = None
+                await browser_pool.release()
+                raise
+
+            logging.info(f"{self.platform_name}浏览器页面设置成功 (CDP)")
+            return True
+
+        except Exception as e:
+            logging.error(f"{self.platform_name}浏览器驱动设置失败: {e}")
+            return False
+
+    async def cleanup_driver(self):
+        """关闭浏览器上下文并释放共享浏览器"""
+        if self.driver:
+            self.driver = None
+            try:
+                await self.browser_context.close()
+            except Exception:
+                pass
+            self.browser_context = None
+            await browser_pool.release()
+            logging.info(f"{self.platform_name}浏览器页面已清理 (CDP)")
+
+    async def set_page_load_timeout(self, timeout):
+        """页面操作每次调用时读取page_load_timeout，无需更新浏览器"""
+        pass
+
+    def to_playwright_selector(self, by, selector):
+        """将Selenium定位方式转换为Playwright选择器"""
+        if by == By.XPATH:
+            return f"xpath={selector}"
+        return selector
+
+    async def load_page(self, url):
+        """打开页面"""
+        await self.driver.goto(url, wait_until='domcontentloaded',
+                               timeout=self.page_load_timeout * 1000)
+
+    async def wait_for_page_ready(self, timeout):
+        """等待页面加载完成"""
+        await self.driver.wait_for_load_state('load', timeout=timeout * 1000)
+
+    async def get_page_title(self):
+        """获取页面标题"""
+        return await self.driver.title()
+
+    async def refresh_page(self):
+        """刷新页面"""
+        await self.driver.reload(wait_until='domcontentloaded',
+                                 timeout=self.page_load_timeout * 1000)
+
+    async def get_page_source(self):
+        """获取页面源码"""
+        return await self.driver.content()
+
+    async def find_element_texts(self, by, selector):
+        """获取所有匹配元素的文本（一次页面内求值）"""
+        texts = await self.driver.locator(
+            self.to_playwright_selector(by, selector)).all_inner_texts()
+        return [text.strip() for text in texts]
+
+    async def find_element_attributes(self, by, selector, attribute):
+        """获取所有匹配元素的属性值（一次页面内求值）"""
+        # 与Selenium的get_attribute一致，优先返回DOM属性（如src为绝对地址）
+        return await self.driver.eval_on_selector_all(
+            self.to_playwright_selector(by, selector),
+            "(elements, name) => elements.map(e => (name in e ? e[name] : e.getAttribute(name)))",
+            attribute)
+
+    async def execute_script(self, script):
+        """在页面中执行脚本（函数体，用return返回结果）"""
+        return await self.driver.evaluate(f"() => {{ {script} }}")
@@ -0,0 +1,155 @@
+import math
+import time
+from array import array
+
+
+# 检查错误码
+ERROR_NONE = 0
+ERROR_TIMEOUT = 1
+ERROR_BROWSER = 2
+ERROR_PAGE_INVALID = 3
+ERROR_DRIVER_SETUP = 4
+ERROR_UNKNOWN = 5
+ERROR_BUDGET_EXCEEDED = 6
+
+ERROR_NAMES = {
+    ERROR_NONE: 'ok',
+    ERROR_TIMEOUT: 'timeout',
+    ERROR_BROWSER: 'browser_error',
+    ERROR_PAGE_INVALID: 'page_invalid',
+    ERROR_DRIVER_SETUP: 'driver_setup_failed',
+    ERROR_UNKNOWN: 'unknown_error',
+    ERROR_BUDGET_EXCEEDED: 'budget_exceeded',
+}
+
+# 库存状态
+STATE_UNKNOWN = -1
+STATE_SOLD_OUT = 0
+STATE_IN_STOCK = 1
+
+STATE_NAMES = {
+    STATE_UNKNOWN: 'unknown',
+    STATE_SOLD_OUT: 'sold_out',
+    STATE_IN_STOCK: 'in_stock',
+}
+
+
+class CheckRecord:
+    """单次检查结果"""
+
+    __slots__ = ('timestamp', 'duration', 'stock_state', 'error_code')
+
+    def __init__(self, timestamp, duration, stock_state, error_code):
+        self.timestamp = timestamp
+        self.duration = duration
+        self.stock_state = stock_state
+        self.error_code = error_code
+
+    def to_dict(self):
+        return {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.timestamp)),
+            'duration': round(self.duration, 2),
+            'state': STATE_NAMES.get(self.stock_state, 'unknown'),
+            'error': ERROR_NAMES.get(self.error_code, 'unknown_error'),
+        }
+
+
+def percentile(sorted_values, ratio):
+    """最近秩法计算百分位数"""
+    if not sorted_values:
+        return None
+    index = max(math.ceil(ratio * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+class CheckHistory:
+    """最近检查结果的环形缓冲区
+
+    按列存储在定长array中（每条约14字节），写满后覆盖最旧的记录，
+    无论运行多久内存占用都保持不变。
+    """
+
+    def __init__(self, capacity=1024):
+        if capacity < 1:
+            raise ValueError(f"检查记录容量必须至少为1: {capacity}")
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.durations = array('f', bytes(4 * capacity))
+        self.states = array('b', bytes(capacity))
+        self.errors = array('B', bytes(capacity))
+        self.head = 0  # 下一条记录写入位置
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def record(self, timestamp, duration, stock_state, error_code):
+        """写入一条检查结果"""
+        index = self.head
+        self.timestamps[index] = timestamp
+        self.durations[index] = duration
+        self.states[index] = stock_state
+        self.errors[index] = error_code
+        self.head = (index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def records(self, since=0):
+        """按时间顺序返回记录（从旧到新）"""
+        start = (self.head - self.count) % self.capacity
+        for offset in range(self.count):
+            index = (start + offset) % self.capacity
+            if self.timestamps[index] >= since:
+                yield CheckRecord(self.timestamps[index], self.durations[index],
+                                  self.states[index], self.errors[index])
+
+    def latest(self):
+        """最近一条记录，没有记录时返回None"""
+        if not self.count:
+            return None
+        index = (self.head - 1) % self.capacity
+        return CheckRecord(self.timestamps[index], self.durations[index],
+                           self.states[index], self.errors[index])
+
+    def summary(self, window=3600, timeline_limit=20):
+        """统计最近window秒内的检查：延迟百分位、错误分布和状态变化时间线"""
+        since = time.time() - window
+        durations = []
+        error_counts = {}
+        timeline = []
+        last_state = None
+        in_stock_count = 0
+        count = 0
+
+        for record in self.records(since):
+            count += 1
+            durations.append(record.duration)
+            if record.error_code != ERROR_NONE:
+                name = ERROR_NAMES.get(record.error_code, 'unknown_error')
+                error_counts[name] = error_counts.get(name, 0) + 1
+            if record.stock_state == STATE_IN_STOCK:
+                in_stock_count += 1
+
+            # 时间线只记录状态变化
+            if record.stock_state != last_state:
+                timeline.append(record.to_dict())
+                last_state = record.stock_state
+
+        durations.sort()
+
+        def rounded(value):
+            return round(value, 2) if value is not None else None
+
+        return {
+            'window_seconds': window,
+            'checks': count,
+            'errors': error_counts,
+            'success_rate': round(1 - sum(error_counts.values()) / count, 3) if count else None,
+            'in_stock_ratio': round(in_stock_count / count, 3) if count else None,
+            'latency': {
+                'p50': rounded(percentile(durations, 0.5)),
+                'p90': rounded(percentile(durations, 0.9)),
+                'p99': rounded(percentile(durations, 0.99)),
+                'max': rounded(durations[-1] if durations else None),
+            },
+            'timeline': timeline[-timeline_limit:],
+        }
@@ -0,0 +1,73 @@
+import time
+
+
+# 熔断器状态
+STATE_CLOSED = 'closed'  # 正常检查
+STATE_OPEN = 'open'  # 暂停检查，等待冷却
+STATE_HALF_OPEN = 'half_open'  # 冷却结束，试探性检查一次
+
+
+class CircuitBreaker:
+    """单个商品的熔断器
+
+    连续失败达到阈值后熔断，冷却期间不再检查该商品；冷却结束后试探一次，
+    成功则恢复，失败则再次熔断且冷却时间翻倍（不超过最大冷却时间）。
+    """
+
+    def __init__(self, failure_threshold=3, cooldown=30, max_cooldown=600):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.trip_count = 0  # 连续熔断次数，用于计算退避时间
+        self.opened_at = 0
+        self.current_cooldown = 0
+
+    def allow_request(self):
+        """是否允许本次检查；冷却结束时转为半开状态"""
+        if self.state == STATE_OPEN:
+            if self.remaining_cooldown() > 0:
+                return False
+            self.state = STATE_HALF_OPEN
+        return True
+
+    def remaining_cooldown(self):
+        """距离冷却结束的秒数"""
+        if self.state != STATE_OPEN:
+            return 0
+        return max(self.opened_at + self.current_cooldown - time.monotonic(), 0)
+
+    def record_success(self):
+        """记录成功，返回状态是否发生变化"""
+        changed = self.state != STATE_CLOSED
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.trip_count = 0
+        self.current_cooldown = 0
+        return changed
+
+    def record_failure(self):
+        """记录失败，返回是否因此熔断"""
+        self.consecutive_failures += 1
+        if self.state == STATE_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.trip()
+            return True
+        return False
+
+    def trip(self):
+        """进入熔断状态，冷却时间按连续熔断次数指数增长"""
+        self.trip_count += 1
+        self.current_cooldown = min(
+            self.cooldown * 2 ** (self.trip_count - 1), self.max_cooldown)
+        self.opened_at = time.monotonic()
+        self.state = STATE_OPEN
+
+    def get_status(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'cooldown': self.current_cooldown,
+            'remaining_cooldown': round(self.remaining_cooldown(), 1),
+        }
@@ -0,0 +1,209 @@
+import asyncio
+import re
+import urllib.parse
+from .base_monitor import BaseMonitor
+from .cdp_browser import CDPBrowserMixin
+from .keyword_matcher import build_product_matcher, get_storefront_locale
+from .circuit_breaker import STATE_CLOSED
+from .check_history import (ERROR_NONE, ERROR_TIMEOUT, ERROR_BROWSER, ERROR_PAGE_INVALID,
+                            ERROR_DRIVER_SETUP, ERROR_UNKNOWN)
+
+
+# 提取列表页所有商品卡片：spuId -> {url, text}
+# 库存标记（如SOLD OUT）通常在商品卡片容器内而不是链接内，因此向上查找卡片容器：
+# 取只包含这一个商品（spuId）链接的最外层祖先元素，避免取到整个商品网格的文本
+EXTRACT_PRODUCTS_SCRIPT = """
+const selector = "a[href*='/products/']";
+const spuIdOf = link => {
+    const match = link.href.match(/\\/products\\/(\\d+)/);
+    return match ? match[1] : null;
+};
+const products = {};
+for (const link of document.querySelectorAll(selector)) {
+    const spuId = spuIdOf(link);
+    if (!spuId || products[spuId]) continue;
+    let card = link;
+    for (let node = link.parentElement; node && node !== document.body; node = node.parentElement) {
+        const ids = new Set(Array.from(node.querySelectorAll(selector), spuIdOf).filter(Boolean));
+        if (ids.size > 1) break;
+        card = node;
+    }
+    products[spuId] = {url: link.href.split('?')[0], text: card.innerText || ''};
+}
+return products;
+"""
+
+
+class CollectionMonitor(BaseMonitor):
+    """PopMart列表页监控器（分层监控的第一层）
+
+    加载一次合集/搜索列表页即可得到页面上所有商品的库存标记，
+    只有库存标记变化的商品和新出现的商品才需要商品页完整检查。
+    """
+
+    def __init__(self, channel_id, listing_url, min_interval, max_interval,
+                 heartbeat_interval, notification_interval, page_load_timeout=25,
+                 page_load_wait=3, js_render_wait=5, cloudflare_wait=10, verbose_mode=False,
+                 history_size=1024, check_budget=60, breaker_threshold=3, breaker_cooldown=30,
+                 breaker_max_cooldown=600, full_check_interval=600, locale=None,
+                 keyword_tables=None, auto_add=False, on_sweep=None, on_coverage_change=None):
+        super().__init__(
+            platform_name="PopMart Listing",
+            channel_id=channel_id,
+            product_url=listing_url,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            heartbeat_interval=heartbeat_interval,
+            notification_interval=notification_interval,
+            page_load_timeout=page_load_timeout,
+            page_load_wait=page_load_wait,
+            js_render_wait=js_render_wait,
+            cloudflare_wait=cloudflare_wait,
+            verbose_mode=verbose_mode,
+            history_size=history_size,
+            check_budget=check_budget,
+            breaker_threshold=breaker_threshold,
+            breaker_cooldown=breaker_cooldown,
+            breaker_max_cooldown=breaker_max_cooldown,
+            full_check_interval=full_check_interval
+        )
+        self.current_stock_status = False
+        self.product_key = self.get_listing_key(listing_url)
+        self.auto_add = auto_add
+        self.on_sweep = on_sweep  # 扫描回调: async (listing, changed_ids, new_ids)
+        self.on_coverage_change = on_coverage_change  # 每次检查后回调，刷新商品的列表页驱动状态
+
+        # 列表页状态：spuId -> 是否可购买 / 商品URL
+        self.availability = {}
+        self.product_urls = {}
+        self.baseline_ready = False
+        self.swept_ids = set()  # 最近一次成功扫描中出现的商品
+
+        self.locale = locale or get_storefront_locale(listing_url)
+        self.build_keyword_matcher(keyword_tables)
+
+    def build_keyword_matcher(self, keyword_tables=None):
+        """构建商品卡片文本的库存关键词分类器"""
+        self.keyword_tables = keyword_tables
+        self.keyword_matcher = build_product_matcher(
+            [], self.locale, keyword_tables)
+
+    def apply_keywords(self, locale, keyword_tables):
+        """热更新站点语言和关键词表"""
+        self.locale = locale or get_storefront_locale(self.product_url)
+        self.build_keyword_matcher(keyword_tables)
+
+    def get_listing_key(self, url):
+        """列表页在状态接口中的标识（可用于URL路径），如 listing-sg-collection-11-labubu"""
+        parsed = urllib.parse.urlparse(url)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-',
+                      urllib.parse.unquote(f"{parsed.path}-{parsed.query}")).strip('-')
+        return f"listing-{slug}" if slug else "listing"
+
+    def get_status(self, window=3600):
+        """获取列表页状态：库存状态为最近一次扫描中是否有可购买商品"""
+        status = super().get_status(window)
+        status['listing'] = {
+            'products': len(self.swept_ids),
+            'available': sum(1 for spu_id in self.swept_ids if self.availability.get(spu_id)),
+            'covered': len(self.covered_product_ids()),
+        }
+        return status
+
+    def extract_product_name_from_url(self, url):
+        """从列表页URL生成显示名称"""
+        try:
+            path = urllib.parse.urlparse(url).path.strip('/')
+            name = urllib.parse.unquote(path.split('/')[-1]) if path else ''
+            return f"Listing {name}" if name else "PopMart Listing"
+        except:
+            return "PopMart Listing"
+
+    def covered_product_ids(self):
+        """由本列表页驱动的商品：最近一次扫描成功且未熔断时，为该次扫描中出现的商品"""
+        if self.circuit_breaker.state != STATE_CLOSED:
+            return set()
+        return self.swept_ids
+
+    async def update_circuit_breaker(self, client):
+        """更新熔断器后刷新列表页覆盖的商品，扫描失败时商品立即恢复按间隔轮询"""
+        await super().update_circuit_breaker(client)
+        if self.check_error != ERROR_NONE:
+            self.swept_ids = set()
+        if self.on_coverage_change:
+            self.on_coverage_change()
+
+    def is_card_available(self, text):
+        """根据商品卡片文本判断是否可购买"""
+        hits = self.keyword_matcher.scan(text)
+        return 'sold_out' not in hits and 'unavailable' not in hits
+
+    async def check_stock_and_notify(self, client):
+        """扫描列表页，找出库存标记变化的商品和新商品"""
+        try:
+            if self.driver is None:
+                if not await self.setup_driver():
+                    self.check_error = ERROR_DRIVER_SETUP
+                    return False
+
+            print("🗂️ 正在扫描列表页...", end="", flush=True)
+            await self.load_page(self.product_url)
+            await asyncio.sleep(self.page_load_wait)
+            await self.wait_for_page_ready(self.page_load_timeout)
+
+            # 检查Cloudflare阻塞
+            title = await self.get_page_title()
+            if "Just a moment" in title or "Access denied" in title:
+                print(" ⛔ Cloudflare验证，刷新中...", end="", flush=True)
+                await self.refresh_page()
+                await asyncio.sleep(self.cloudflare_wait)
+
+            cards = await self.execute_script(EXTRACT_PRODUCTS_SCRIPT) or {}
+            if not cards:
+                print(" ❌ 列表页异常，未找到商品")
+                self.check_error = ERROR_PAGE_INVALID
+                return False
+
+            # 压缩为 spuId -> 是否可购买
+            sweep = {spu_id: self.is_card_available(card.get('text', ''))
+                     for spu_id, card in cards.items()}
+
+            changed_ids = [spu_id for spu_id, available in sweep.items()
+                           if spu_id in self.availability and self.availability[spu_id] != available]
+            # 第一次扫描只建立基线，之后出现的商品才算新商品
+            new_ids = [spu_id for spu_id in sweep
+                       if spu_id not in self.availability] if self.baseline_ready else []
+
+            # 未出现在本次扫描中的商品保留上次状态（分页或懒加载），但不再由本列表页驱动
+            self.availability.update(sweep)
+            self.swept_ids = set(sweep)
+            for spu_id, card in cards.items():
+                self.product_urls[spu_id] = card.get('url')
+            self.baseline_ready = True
+
+            available_count = sum(1 for available in sweep.values() if available)
+            self.current_stock_status = available_count > 0
+            self.last_stock_status = self.current_stock_status
+            print(f" 📋 {len(sweep)}个商品 | 可购买{available_count} | 变化{len(changed_ids)} | 新品{len(new_ids)}", end="")
+
+            if self.on_sweep:
+                await self.on_sweep(self, changed_ids, new_ids)
+            return bool(changed_ids or new_ids)
+
+        except self.timeout_errors:
+            print("⏰ PopMart列表页加载超时")
+            self.check_error = ERROR_TIMEOUT
+            return False
+        except self.browser_errors as e:
+            print(f"🔧 浏览器错误: {e}")
+            self.check_error = ERROR_BROWSER
+            await self.cleanup_driver()
+            return False
+        except Exception as e:
+            print(f"❌ PopMart列表页扫描出错: {e}")
+            self.check_error = ERROR_UNKNOWN
+            return False
+
+
+class CollectionCDPMonitor(CDPBrowserMixin, CollectionMonitor):
+    """PopMart列表页监控器（CDP异步浏览器引擎）"""
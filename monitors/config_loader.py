@@ -0,0 +1,139 @@
+import asyncio
+import os
+import logging
+from .keyword_matcher import DEFAULT_KEYWORDS
+
+
+# 配置文件中允许出现的参数名（与PopMartMonitor.get_unified_config保持一致）
+SETTING_KEYS = (
+    'min_interval',
+    'max_interval',
+    'notification_interval',
+    'heartbeat_interval',
+    'page_load_timeout',
+    'page_load_wait',
+    'js_render_wait',
+    'cloudflare_wait',
+    'check_budget',
+    'breaker_threshold',
+    'breaker_cooldown',
+    'breaker_max_cooldown',
+    'full_check_interval',
+)
+
+
+def parse_entries(data, section, settings, keyword_tables):
+    """解析商品或列表页条目，条目中的参数覆盖全局参数"""
+    entries = []
+    seen_urls = set()
+    for index, entry in enumerate(data.get(section, [])):
+        url = entry.get('url')
+        if not url:
+            raise ValueError(f"{section}[{index}] 缺少url")
+        if url in seen_urls:
+            raise ValueError(f"URL重复: {url}")
+        webhook_url = entry.get('webhook_url')
+        if 'channel_id' not in entry and not webhook_url:
+            raise ValueError(f"{section}[{index}] 缺少channel_id或webhook_url")
+        seen_urls.add(url)
+
+        parsed = {
+            'url': url,
+            # 仅配置Webhook时以Webhook URL作为频道标识
+            'channel_id': int(entry['channel_id']) if 'channel_id' in entry else webhook_url,
+            'webhook_url': webhook_url,
+            'locale': entry.get('locale'),
+            'keyword_tables': keyword_tables,
+            'auto_add': bool(entry.get('auto_add', False)),
+            'settings': dict(settings),
+        }
+        for key in SETTING_KEYS:
+            if key in entry:
+                parsed['settings'][key] = int(entry[key])
+        entries.append(parsed)
+    return entries
+
+
+def load_config_file(path, defaults):
+    """读取TOML配置文件，返回 (全局参数, 商品列表, 列表页列表)
+
+    配置文件格式:
+        [settings]
+        min_interval = 3
+
+        [[products]]
+        url = "https://www.popmart.com/sg/products/1149/..."
+        channel_id = 123456789
+        webhook_url = "https://discord.com/api/webhooks/..."  # 可选，Webhook模式使用
+        locale = "sg"       # 可选，默认从URL中识别站点
+        min_interval = 10   # 可选，覆盖全局参数
+
+        [[listings]]        # 可选，分层监控扫描的列表页
+        url = "https://www.popmart.com/sg/collection/..."
+        channel_id = 123456789
+        auto_add = true     # 可选，新商品自动加入监控
+
+        [keywords.jp]       # 可选，按站点覆盖库存关键词
+        sold_out = ["売り切れ"]
+    """
+    # 仅使用配置文件时才需要TOML解析器，Python 3.11以下使用tomli
+    try:
+        import tomllib
+    except ImportError:
+        import tomli as tomllib
+
+    with open(path, 'rb') as f:
+        data = tomllib.load(f)
+
+    settings = dict(defaults)
+    for key, value in data.get('settings', {}).items():
+        if key not in SETTING_KEYS:
+            raise ValueError(f"未知的配置项: settings.{key}")
+        settings[key] = int(value)
+
+    keyword_tables = {}
+    for locale, table in data.get('keywords', {}).items():
+        for category, words in table.items():
+            if category not in DEFAULT_KEYWORDS:
+                raise ValueError(f"未知的关键词分类: keywords.{locale}.{category}")
+            if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+                raise ValueError(f"keywords.{locale}.{category} 必须为字符串列表")
+        keyword_tables[locale.lower()] = dict(table)
+
+    products = parse_entries(data, 'products', settings, keyword_tables)
+    listings = parse_entries(data, 'listings', settings, keyword_tables)
+    return settings, products, listings
+
+
+class ConfigWatcher:
+    """监视配置文件变化，变化后回调重新加载"""
+
+    def __init__(self, path, on_change, poll_interval=2):
+        self.path = path
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.last_mtime = self.get_mtime()
+
+    def get_mtime(self):
+        """获取配置文件修改时间，文件不存在时返回None"""
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    async def watch(self, client):
+        """轮询配置文件修改时间，直到客户端关闭"""
+        while not client.is_closed():
+            await asyncio.sleep(self.poll_interval)
+
+            mtime = self.get_mtime()
+            if mtime is None or mtime == self.last_mtime:
+                continue
+            self.last_mtime = mtime
+
+            print(f"\n🔄 检测到配置文件变化: {self.path}")
+            try:
+                await self.on_change()
+            except Exception as e:
+                # 配置有误时保留当前运行状态，等待下一次修改
+                logging.error(f"配置文件重新加载失败，保持当前配置: {e}")
@@ -0,0 +1,85 @@
+import re
+
+
+# 默认（英文站点）关键词表
+#   sold_out:    页面或按钮出现即视为售罄
+#   unavailable: 按钮出现即视为不可购买（如到货提醒、即将发售）
+#   buy:         购买按钮文本
+#   purchase:    备用按钮识别的宽松关键词
+DEFAULT_KEYWORDS = {
+    'sold_out': ['SOLD OUT', 'OUT OF STOCK'],
+    'unavailable': ['NOTIFY ME', 'COMING SOON'],
+    'buy': ['BUY NOW', 'ADD TO CART'],
+    'purchase': ['BUY', 'CART', 'PURCHASE'],
+}
+
+# 各站点语言的关键词表，键为URL中的站点代码（如 popmart.com/sg/...）
+# 未配置的站点或分类使用默认关键词表，可在配置文件的 [keywords.<站点>] 中覆盖
+STOREFRONT_KEYWORDS = {
+    'default': DEFAULT_KEYWORDS,
+}
+
+
+def get_storefront_locale(url):
+    """从PopMart URL中提取站点代码，如 https://www.popmart.com/sg/products/... -> sg"""
+    match = re.search(r'popmart\.com/([a-z]{2}(?:-[a-z]{2})?)/', url or '', re.IGNORECASE)
+    return match.group(1).lower() if match else 'default'
+
+
+def get_keyword_table(locale, keyword_tables=None):
+    """合并默认、内置和配置文件中的关键词表"""
+    table = dict(DEFAULT_KEYWORDS)
+    table.update(STOREFRONT_KEYWORDS.get(locale, {}))
+    if keyword_tables:
+        table.update(keyword_tables.get('default', {}))
+        table.update(keyword_tables.get(locale, {}))
+    return table
+
+
+class KeywordMatcher:
+    """多关键词分类器
+
+    所有关键词编译为一个忽略大小写的正则，一次扫描返回所有分类的命中及位置。
+    正则包在零宽前瞻中，在每个位置都尝试匹配，相互重叠的关键词（如"merbubuy now"中的
+    "BUY NOW"）不会被前一个命中吞掉。每个位置取最长的关键词，同一位置开始的较短关键词
+    （如"BUY NOW"开头的"BUY"）同时计入，结果与逐个子串查找一致。
+    """
+
+    def __init__(self, categories):
+        keywords = {}
+        for category, words in categories.items():
+            for word in words:
+                if word:
+                    keywords.setdefault(word.lower(), (word, []))[1].append(category)
+
+        # 每个关键词命中时展开为 (分类, 关键词)，包括以它为前缀开头的较短关键词
+        self.expansions = {}
+        for folded in keywords:
+            self.expansions[folded] = [
+                (category, other_word)
+                for other_folded, (other_word, other_categories) in keywords.items()
+                if folded.startswith(other_folded)
+                for category in other_categories]
+
+        ordered = sorted(keywords, key=len, reverse=True)
+        self.pattern = re.compile(
+            '(?=(' + '|'.join(re.escape(word) for word in ordered) + '))',
+            re.IGNORECASE) if ordered else None
+        self.categories = set(categories)
+
+    def scan(self, text):
+        """扫描文本，返回 {分类: [(位置, 关键词), ...]}，未命中的分类不出现"""
+        hits = {}
+        if not self.pattern or not text:
+            return hits
+        for match in self.pattern.finditer(text):
+            for category, word in self.expansions.get(match.group(1).lower(), ()):
+                hits.setdefault(category, []).append((match.start(), word))
+        return hits
+
+
+def build_product_matcher(product_keywords, locale='default', keyword_tables=None):
+    """为单个商品构建分类器：商品名关键词 + 站点库存关键词"""
+    categories = dict(get_keyword_table(locale, keyword_tables))
+    categories['product'] = [word for word in product_keywords if len(word) > 3]
+    return KeywordMatcher(categories)
@@ -2,10 +2,11 @@ import asyncio
 import time
 import discord
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
 from .base_monitor import BaseMonitor
+from .check_history import (ERROR_TIMEOUT, ERROR_BROWSER, ERROR_PAGE_INVALID,
+                            ERROR_DRIVER_SETUP, ERROR_UNKNOWN)
+from .cdp_browser import CDPBrowserMixin
+from .keyword_matcher import build_product_matcher, get_keyword_table, get_storefront_locale
 
 
 class OfficialMonitor(BaseMonitor):
@@ -13,7 +14,10 @@ class OfficialMonitor(BaseMonitor):
 
     def __init__(self, channel_id, product_url, min_interval, max_interval,
                  heartbeat_interval, notification_interval, page_load_timeout=25,
-                 page_load_wait=3, js_render_wait=5, cloudflare_wait=10, verbose_mode=False):
+                 page_load_wait=3, js_render_wait=5, cloudflare_wait=10, verbose_mode=False,
+                 history_size=1024, check_budget=60, breaker_threshold=3, breaker_cooldown=30,
+                 breaker_max_cooldown=600, full_check_interval=600, locale=None,
+                 keyword_tables=None):
         super().__init__(
             platform_name="PopMart Official",
             channel_id=channel_id,
@@ -26,10 +30,39 @@ class OfficialMonitor(BaseMonitor):
             page_load_wait=page_load_wait,
             js_render_wait=js_render_wait,
             cloudflare_wait=cloudflare_wait,
-            verbose_mode=verbose_mode
+            verbose_mode=verbose_mode,
+            history_size=history_size,
+            check_budget=check_budget,
+            breaker_threshold=breaker_threshold,
+            breaker_cooldown=breaker_cooldown,
+            breaker_max_cooldown=breaker_max_cooldown,
+            full_check_interval=full_check_interval
         )
         self.current_stock_status = False
 
+        # 站点语言关键词分类器（每个商品构建一次）
+        self.locale = locale or get_storefront_locale(product_url)
+        self.build_keyword_matcher(keyword_tables)
+
+    def apply_keywords(self, locale, keyword_tables):
+        """热更新站点语言和关键词表"""
+        self.locale = locale or get_storefront_locale(self.product_url)
+        self.build_keyword_matcher(keyword_tables)
+
+    def build_keyword_matcher(self, keyword_tables=None):
+        """按站点语言构建页面关键词分类器和购买按钮XPath"""
+        product_keywords = self.extract_product_name_from_url(
+            self.product_url).split()[:2]
+        self.keyword_matcher = build_product_matcher(
+            product_keywords, self.locale, keyword_tables)
+
+        # XPath 1.0不支持忽略大小写，用translate将拉丁字母转为大写后匹配
+        buy_keywords = get_keyword_table(self.locale, keyword_tables)['buy']
+        conditions = " or ".join(
+            f"contains(translate(text(), 'abcdefghijklmnopqrstuvwxyz', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'), '{keyword.upper()}')"
+            for keyword in buy_keywords if "'" not in keyword)
+        self.buy_button_xpath = f"//*[{conditions}]" if conditions else None
+
     def extract_product_name_from_url(self, url):
         """从PopMart URL中提取商品名称"""
         try:
@@ -104,38 +137,38 @@ class OfficialMonitor(BaseMonitor):
         """检查PopMart官网库存状态"""
         try:
             if self.driver is None:
-                if not self.setup_driver():
+                if not await self.setup_driver():
+                    self.check_error = ERROR_DRIVER_SETUP
                     return False
 
             # 访问PopMart产品页面
             print("🌐 正在访问PopMart产品页面...", end="", flush=True)
-            self.driver.get(self.product_url)
+            await self.load_page(self.product_url)
             await asyncio.sleep(self.page_load_wait)
 
             # 等待页面准备就绪
-            WebDriverWait(self.driver, self.page_load_timeout).until(
-                lambda d: d.execute_script(
-                    "return document.readyState") == "complete"
-            )
+            await self.wait_for_page_ready(self.page_load_timeout)
 
             # 检查Cloudflare阻塞
-            title = self.driver.title
+            title = await self.get_page_title()
             if "Just a moment" in title or "Access denied" in title:
                 print(" ⛔ Cloudflare验证，刷新中...", end="", flush=True)
-                self.driver.refresh()
+                await self.refresh_page()
                 await asyncio.sleep(self.cloudflare_wait)
 
             # 验证页面内容
-            page_source = self.driver.page_source
+            page_source = await self.get_page_source()
             url_product_name = self.extract_product_name_from_url(
                 self.product_url)
             key_words = url_product_name.split()[:2]
 
-            page_valid = any(len(word) > 3 and word.upper()
-                             in page_source.upper() for word in key_words)
+            # 一次扫描得到商品名、售罄、购买等所有关键词命中
+            page_hits = self.keyword_matcher.scan(page_source)
+            page_valid = 'product' in page_hits
 
             if not page_valid:
                 print(f" ❌ 页面异常，未找到关键词: {key_words}")
+                self.check_error = ERROR_PAGE_INVALID
                 return False
 
             print(" ✅ 页面OK，检查库存中...", end="", flush=True)
@@ -162,10 +195,9 @@ class OfficialMonitor(BaseMonitor):
 
                 for selector in price_selectors:
                     try:
-                        price_elements = self.driver.find_elements(
+                        price_texts = await self.find_element_texts(
                             By.CSS_SELECTOR, selector)
-                        for element in price_elements:
-                            text = element.text.strip()
+                        for text in price_texts:
                             if "S$" in text and any(char.isdigit() for char in text):
                                 product_price = text
                                 break
@@ -178,7 +210,6 @@ class OfficialMonitor(BaseMonitor):
 
             # 获取更准确的产品标题
             try:
-                url_keywords = url_product_name.split()[:2]
                 title_selectors = [
                     "h1",
                     "[class*='title']",
@@ -190,18 +221,12 @@ class OfficialMonitor(BaseMonitor):
                 original_title = product_title
                 for selector in title_selectors:
                     try:
-                        title_elements = self.driver.find_elements(
+                        title_texts = await self.find_element_texts(
                             By.CSS_SELECTOR, selector)
-                        for element in title_elements:
-                            text = element.text.strip()
-                            if text and len(text) > 10:
-                                text_upper = text.upper()
-                                for keyword in url_keywords:
-                                    if len(keyword) > 3 and keyword.upper() in text_upper:
-                                        product_title = text
-                                        break
-                                if product_title != original_title:
-                                    break
+                        for text in title_texts:
+                            if text and len(text) > 10 and 'product' in self.keyword_matcher.scan(text):
+                                product_title = text
+                                break
                         if product_title != original_title:
                             break
                     except:
@@ -216,9 +241,9 @@ class OfficialMonitor(BaseMonitor):
             # 获取产品图片
             try:
                 # 优先使用PopMart CDN图片
-                img_elements = self.driver.find_elements(By.TAG_NAME, "img")
-                for img in img_elements:
-                    src = img.get_attribute('src')
+                img_sources = await self.find_element_attributes(
+                    By.TAG_NAME, "img", 'src')
+                for src in img_sources:
                     if src and 'prod-eurasian-res.popmart.com' in src:
                         product_image_url = src
                         break
@@ -232,10 +257,10 @@ class OfficialMonitor(BaseMonitor):
                     ]
                     for selector in selectors:
                         try:
-                            elements = self.driver.find_elements(
-                                By.CSS_SELECTOR, selector)
-                            if elements:
-                                src = elements[0].get_attribute('src')
+                            sources = await self.find_element_attributes(
+                                By.CSS_SELECTOR, selector, 'src')
+                            if sources:
+                                src = sources[0]
                                 if src and any(ext in src.lower() for ext in ['.jpg', '.jpeg', '.png', '.webp']):
                                     if src.startswith('//'):
                                         src = 'https:' + src
@@ -251,17 +276,17 @@ class OfficialMonitor(BaseMonitor):
             # 检查库存状态
             try:
                 # 查找购买按钮
-                buy_elements = []
+                buy_texts = []
                 try:
-                    buy_elements = self.driver.find_elements(
-                        By.XPATH, "//*[contains(text(), 'BUY NOW') or contains(text(), 'Buy Now') or contains(text(), 'ADD TO CART') or contains(text(), 'Add to Cart')]")
+                    if self.buy_button_xpath:
+                        buy_texts = await self.find_element_texts(
+                            By.XPATH, self.buy_button_xpath)
 
-                    if buy_elements:
-                        button_text = buy_elements[0].text.strip()
+                    if buy_texts:
+                        button_text = buy_texts[0]
 
-                        unavailable_keywords = [
-                            "SOLD OUT", "OUT OF STOCK", "NOTIFY ME", "COMING SOON"]
-                        if any(keyword in button_text.upper() for keyword in unavailable_keywords):
+                        button_hits = self.keyword_matcher.scan(button_text)
+                        if 'sold_out' in button_hits or 'unavailable' in button_hits:
                             stock_available = False
                         else:
                             stock_available = True
@@ -270,7 +295,7 @@ class OfficialMonitor(BaseMonitor):
                     pass
 
                 # CSS选择器备用方案
-                if not buy_elements:
+                if not buy_texts:
                     button_selectors = [
                         "button[class*='buy']", "div[class*='buy']", "[class*='add-to-cart']",
                         "[class*='purchase']", ".btn-primary", ".btn-buy"
@@ -278,14 +303,13 @@ class OfficialMonitor(BaseMonitor):
 
                     for selector in button_selectors:
                         try:
-                            elements = self.driver.find_elements(
+                            texts = await self.find_element_texts(
                                 By.CSS_SELECTOR, selector)
-                            for element in elements:
-                                text = element.text.strip().upper()
-                                if any(keyword in text for keyword in ["BUY", "CART", "PURCHASE"]):
-                                    button_text = text
-                                    stock_available = not any(keyword in text for keyword in [
-                                                              "SOLD OUT", "OUT OF STOCK"])
+                            for text in texts:
+                                text_hits = self.keyword_matcher.scan(text)
+                                if 'purchase' in text_hits or 'buy' in text_hits:
+                                    button_text = text.upper()
+                                    stock_available = 'sold_out' not in text_hits
                                     break
                             if button_text:
                                 break
@@ -294,13 +318,12 @@ class OfficialMonitor(BaseMonitor):
 
                 # 页面文本分析
                 if not button_text:
-                    page_text = page_source.upper()
-                    if "SOLD OUT" in page_text or "OUT OF STOCK" in page_text:
+                    if 'sold_out' in page_hits:
                         stock_available = False
-                        button_text = "SOLD OUT"
-                    elif "BUY NOW" in page_text or "ADD TO CART" in page_text:
+                        button_text = page_hits['sold_out'][0][1].upper()
+                    elif 'buy' in page_hits:
                         stock_available = True
-                        button_text = "BUY NOW"
+                        button_text = page_hits['buy'][0][1].upper()
                     else:
                         stock_available = False
                         button_text = "未知状态"
@@ -342,80 +365,80 @@ class OfficialMonitor(BaseMonitor):
             if not should_notify:
                 return False
 
-            # 发送Discord通知
-            channel = client.get_channel(self.channel_id)
-            if channel:
-                # 创建Discord embed
-                embed = discord.Embed(
-                    title=notification_title,
-                    description=f"**Store:** popmart.com/SG",
-                    color=0xff6b6b  # 红色
-                )
-
-                embed.add_field(
-                    name="📦 In-Stock Item",
-                    value=product_title,
-                    inline=False
-                )
-
-                embed.add_field(
-                    name="💰 Price",
-                    value=product_price,
-                    inline=True
-                )
-
-                embed.add_field(
-                    name="📊 Status",
-                    value=button_text,
-                    inline=True
-                )
-
-                # 创建快速结算URL
-                quick_checkout_url = None
-                if product_spu_id and product_sku_id:
-                    quick_checkout_url = self.create_quick_checkout_url(
-                        product_spu_id, product_sku_id, product_title)
-
-                # 构建链接文本
-                links_text = f"[Product Link]({self.product_url})"
-                if quick_checkout_url:
-                    links_text += f"\n[Checkout Page]({quick_checkout_url})"
-
-                embed.add_field(
-                    name="🛒 Quick Links",
-                    value=links_text,
-                    inline=False
-                )
-
-                embed.add_field(
-                    name="🔔 Alert",
-                    value="**Go Go Go!** Limited stock available.",
-                    inline=False
-                )
-
-                # 添加产品图片
-                if product_image_url:
-                    embed.set_thumbnail(url=product_image_url)
-
-                # 添加时间戳和页脚
-                embed.set_footer(
-                    text=f"PopMart Monitor by FK_popmart | {time.strftime('%Y-%m-%d %H:%M:%S')}")
-
-                # 发送通知
-                mention_message = "@here"
-                await channel.send(content=mention_message, embed=embed)
-                return True
-            else:
-                print(f"❌ 找不到Discord频道: {self.channel_id}")
-                return False
+            # 创建Discord embed
+            embed = discord.Embed(
+                title=notification_title,
+                description=f"**Store:** popmart.com/SG",
+                color=0xff6b6b  # 红色
+            )
+
+            embed.add_field(
+                name="📦 In-Stock Item",
+                value=product_title,
+                inline=False
+            )
+
+            embed.add_field(
+                name="💰 Price",
+                value=product_price,
+                inline=True
+            )
 
-        except TimeoutException:
+            embed.add_field(
+                name="📊 Status",
+                value=button_text,
+                inline=True
+            )
+
+            # 创建快速结算URL
+            quick_checkout_url = None
+            if product_spu_id and product_sku_id:
+                quick_checkout_url = self.create_quick_checkout_url(
+                    product_spu_id, product_sku_id, product_title)
+
+            # 构建链接文本
+            links_text = f"[Product Link]({self.product_url})"
+            if quick_checkout_url:
+                links_text += f"\n[Checkout Page]({quick_checkout_url})"
+
+            embed.add_field(
+                name="🛒 Quick Links",
+                value=links_text,
+                inline=False
+            )
+
+            embed.add_field(
+                name="🔔 Alert",
+                value="**Go Go Go!** Limited stock available.",
+                inline=False
+            )
+
+            # 添加产品图片
+            if product_image_url:
+                embed.set_thumbnail(url=product_image_url)
+
+            # 添加时间戳和页脚
+            embed.set_footer(
+                text=f"PopMart Monitor by FK_popmart | {time.strftime('%Y-%m-%d %H:%M:%S')}")
+
+            # 通知主频道和所有订阅频道（检查结束后在时间预算之外发送）
+            self.queue_notification(embed)
+            return True
+
+        except self.timeout_errors:
             print("⏰ PopMart页面加载超时")
+            self.check_error = ERROR_TIMEOUT
             return False
-        except WebDriverException as e:
+        except self.browser_errors as e:
             print(f"🔧 浏览器错误: {e}")
-            self.cleanup_driver()
+            self.check_error = ERROR_BROWSER
+            await self.cleanup_driver()
             return False
         except Exception as e:
             print(f"❌ PopMart检查出错: {e}")
+            self.check_error = ERROR_UNKNOWN
             return False
+
+
+class OfficialCDPMonitor(CDPBrowserMixin, OfficialMonitor):
+    """PopMart官网库存监控器（CDP异步浏览器引擎）"""
@@ -0,0 +1,62 @@
+import logging
+from aiohttp import web
+
+
+class StatusServer:
+    """本地HTTP状态接口，以JSON返回各商品最近的检查统计
+
+    GET /status                    所有商品的统计
+    GET /status/{product_key}      单个商品（spuId）或列表页（listing-...）的统计和最近检查记录
+    可选参数: window=统计时间窗口（秒，默认3600），limit=返回记录数（默认100）
+    """
+
+    def __init__(self, get_monitors, host='127.0.0.1', port=8080):
+        self.get_monitors = get_monitors
+        self.host = host
+        self.port = port
+        self.runner = None
+
+    def get_window(self, request):
+        try:
+            return max(int(request.query.get('window', 3600)), 1)
+        except ValueError:
+            raise web.HTTPBadRequest(text="window必须为整数（秒）")
+
+    async def handle_status(self, request):
+        window = self.get_window(request)
+        return web.json_response({
+            'products': [monitor.get_status(window) for monitor in self.get_monitors()],
+        })
+
+    async def handle_product_status(self, request):
+        window = self.get_window(request)
+        try:
+            limit = max(int(request.query.get('limit', 100)), 0)
+        except ValueError:
+            raise web.HTTPBadRequest(text="limit必须为整数")
+
+        product_key = request.match_info['product_key']
+        for monitor in self.get_monitors():
+            if monitor.product_key == product_key:
+                status = monitor.get_status(window)
+                records = [record.to_dict()
+                           for record in monitor.history.records()]
+                status['records'] = records[-limit:] if limit else []
+                return web.json_response(status)
+        raise web.HTTPNotFound(text=f"未找到商品: {product_key}")
+
+    async def start(self):
+        """启动HTTP服务"""
+        app = web.Application()
+        app.router.add_get('/status', self.handle_status)
+        app.router.add_get('/status/{product_key}', self.handle_product_status)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        logging.info(f"状态接口已启动: http://{self.host}:{self.port}/status")
+
+    async def stop(self):
+        """停止HTTP服务"""
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+import re
+import time
+import logging
+
+
+def get_product_key(product):
+    """将商品URL或spuId统一为订阅使用的商品标识"""
+    product = product.strip()
+    match = re.search(r'/products/(\d+)', product)
+    if match:
+        return match.group(1)
+    return product
+
+
+class SubscriptionRegistry:
+    """商品订阅表：商品标识 -> 订阅频道及提醒角色，保存在JSON文件中"""
+
+    def __init__(self, path='subscriptions.json'):
+        self.path = path
+        self.subscriptions = {}  # 商品标识 -> [{'channel_id': ..., 'role_id': ...}]
+        self.load()
+
+    def load(self):
+        """从文件加载订阅，文件不存在时为空"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.subscriptions = json.load(f)
+        except FileNotFoundError:
+            self.subscriptions = {}
+        except Exception as e:
+            logging.error(f"订阅文件读取失败: {e}")
+            self.subscriptions = {}
+
+    def save(self):
+        """写入订阅文件（先写临时文件再替换，避免写入中断损坏文件）"""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.subscriptions, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def subscribe(self, product_key, channel_id, role_id=None):
+        """添加订阅，频道已订阅时更新提醒角色。返回是否为新订阅"""
+        subscribers = self.subscriptions.setdefault(product_key, [])
+        for subscriber in subscribers:
+            if subscriber['channel_id'] == channel_id:
+                subscriber['role_id'] = role_id
+                self.save()
+                return False
+        subscribers.append({'channel_id': channel_id, 'role_id': role_id})
+        self.save()
+        return True
+
+    def unsubscribe(self, product_key, channel_id):
+        """取消订阅，返回是否存在该订阅"""
+        subscribers = self.subscriptions.get(product_key, [])
+        remaining = [s for s in subscribers if s['channel_id'] != channel_id]
+        if len(remaining) == len(subscribers):
+            return False
+        if remaining:
+            self.subscriptions[product_key] = remaining
+        else:
+            del self.subscriptions[product_key]
+        self.save()
+        return True
+
+    def get_subscribers(self, product_key):
+        """获取商品的所有订阅"""
+        return list(self.subscriptions.get(product_key, []))
+
+    def get_channel_subscriptions(self, channel_id):
+        """获取频道订阅的所有商品 [(商品标识, 角色ID)]"""
+        return [(product_key, subscriber['role_id'])
+                for product_key, subscribers in self.subscriptions.items()
+                for subscriber in subscribers
+                if subscriber['channel_id'] == channel_id]
+
+
+class FanoutSender:
+    """将一条库存通知并发发送到多个频道
+
+    总并发数受信号量限制，同一频道两次发送之间至少间隔channel_interval秒。
+    """
+
+    def __init__(self, max_concurrency=5, channel_interval=1.0):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.channel_interval = channel_interval
+        self.last_sent = {}  # 频道ID -> 上次发送时间
+        self.channel_locks = {}  # 频道ID -> 锁，保证同频道按顺序发送
+
+    async def send_to_channel(self, client, channel_id, content, embed):
+        """发送到单个频道，返回是否成功"""
+        lock = self.channel_locks.setdefault(channel_id, asyncio.Lock())
+        async with lock:
+            delay = self.last_sent.get(
+                channel_id, 0) + self.channel_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            async with self.semaphore:
+                channel = client.get_channel(channel_id)
+                if not channel:
+                    print(f"❌ 找不到Discord频道: {channel_id}")
+                    return False
+                try:
+                    result = await channel.send(content=content, embed=embed)
+                    return result is not False
+                except Exception as e:
+                    logging.error(f"频道 {channel_id} 通知发送失败: {e}")
+                    return False
+                finally:
+                    self.last_sent[channel_id] = time.monotonic()
+
+    async def send(self, client, targets, embed):
+        """并发发送到所有目标 [(频道ID, 提醒内容)]，返回成功数量"""
+        results = await asyncio.gather(*(
+            self.send_to_channel(client, channel_id, content, embed)
+            for channel_id, content in targets))
+        return sum(1 for result in results if result)
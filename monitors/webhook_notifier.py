@@ -0,0 +1,139 @@
+import asyncio
+import time
+import logging
+import aiohttp
+
+
+class WebhookChannel:
+    """Webhook发送目标，提供与discord频道相同的send接口"""
+
+    def __init__(self, notifier, channel_id, webhook_url):
+        self.notifier = notifier
+        self.id = channel_id
+        self.name = f"webhook:{channel_id}"
+        self.webhook_url = webhook_url
+
+    async def send(self, content=None, embed=None):
+        """发送消息到Webhook"""
+        return await self.notifier.post(self.webhook_url, content=content, embed=embed)
+
+
+class WebhookNotifier:
+    """基于Discord Webhook的轻量通知器
+
+    不建立Gateway连接，所有Webhook共用一个aiohttp连接池。
+    提供is_closed/get_channel接口，可直接替代discord.Client传给监控器。
+    """
+
+    def __init__(self, max_retries=3, request_timeout=10, max_connections=10):
+        self.max_retries = max_retries
+        self.request_timeout = request_timeout
+        self.max_connections = max_connections
+        self.webhooks = {}  # 频道ID -> Webhook URL
+        self.rate_limit_reset = {}  # Webhook URL -> 限流解除时间
+        self.session = None
+        self.closed = False
+
+    def register(self, channel_id, webhook_url):
+        """登记频道对应的Webhook URL"""
+        self.webhooks[channel_id] = webhook_url
+
+    def get_channel(self, channel_id):
+        """获取频道对应的Webhook发送目标，未登记时返回None"""
+        webhook_url = self.webhooks.get(channel_id)
+        if not webhook_url:
+            return None
+        return WebhookChannel(self, channel_id, webhook_url)
+
+    def is_closed(self):
+        return self.closed
+
+    async def start(self):
+        """创建共享的HTTP会话"""
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+                connector=aiohttp.TCPConnector(limit=self.max_connections))
+        self.closed = False
+
+    async def close(self):
+        """关闭HTTP会话"""
+        self.closed = True
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def wait_rate_limit(self, webhook_url):
+        """等待该Webhook的限流窗口结束"""
+        delay = self.rate_limit_reset.get(webhook_url, 0) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def update_rate_limit(self, webhook_url, headers):
+        """根据响应头记录限流窗口，额度用完时下次发送前先等待"""
+        try:
+            if headers.get('X-RateLimit-Remaining') == '0':
+                reset_after = float(headers.get('X-RateLimit-Reset-After', 0))
+                self.rate_limit_reset[webhook_url] = time.monotonic() + reset_after
+        except ValueError:
+            pass
+
+    async def get_retry_after(self, response):
+        """读取429响应中的重试等待时间（秒）"""
+        try:
+            data = await response.json(content_type=None)
+            return float(data.get('retry_after', 1))
+        except Exception:
+            try:
+                return float(response.headers.get('Retry-After', 1))
+            except ValueError:
+                return 1.0
+
+    async def post(self, webhook_url, content=None, embed=None):
+        """发送消息到Webhook，遇到限流或服务端错误时重试"""
+        if self.session is None:
+            await self.start()
+
+        payload = {
+            # 允许@here/@everyone和角色提醒生效
+            'allowed_mentions': {'parse': ['everyone', 'roles']},
+        }
+        if content:
+            payload['content'] = content
+        if embed is not None:
+            payload['embeds'] = [embed.to_dict() if hasattr(
+                embed, 'to_dict') else embed]
+
+        for attempt in range(self.max_retries + 1):
+            await self.wait_rate_limit(webhook_url)
+            try:
+                async with self.session.post(webhook_url, json=payload) as response:
+                    self.update_rate_limit(webhook_url, response.headers)
+
+                    if response.status in (200, 204):
+                        return True
+
+                    if response.status == 429:
+                        retry_after = await self.get_retry_after(response)
+                        self.rate_limit_reset[webhook_url] = time.monotonic() + \
+                            retry_after
+                        logging.warning(f"Webhook被限流，{retry_after:.1f}s后重试")
+                        continue
+
+                    if response.status < 500:
+                        # 4xx错误（Webhook失效、参数错误）重试无意义
+                        body = await response.text()
+                        logging.error(
+                            f"Webhook发送失败: HTTP {response.status} {body[:200]}")
+                        return False
+
+                    logging.warning(f"Webhook服务端错误: HTTP {response.status}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.warning(f"Webhook请求出错: {e}")
+
+            # 服务端错误或网络异常，指数退避后重试
+            if attempt < self.max_retries:
+                await asyncio.sleep(2 ** attempt)
+
+        logging.error(f"Webhook发送失败，已重试{self.max_retries}次")
+        return False
@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from selenium.webdriver.common.by import By
+from monitors import cdp_browser
+from monitors.cdp_browser import CDPBrowserPool
+from monitors.official_monitor import OfficialCDPMonitor
+
+
+class FakeContext:
+    def __init__(self, fail_new_page=False):
+        self.fail_new_page = fail_new_page
+        self.closed = False
+
+    async def add_init_script(self, script):
+        pass
+
+    async def new_page(self):
+        if self.fail_new_page:
+            raise RuntimeError("new_page failed")
+        return object()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, fail_new_page=False):
+        self.connected = True
+        self.fail_new_page = fail_new_page
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        context = FakeContext(self.fail_new_page)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    def __init__(self, fail_new_page=False):
+        self.fail_new_page = fail_new_page
+        self.browsers = []
+        self.stopped = False
+        self.chromium = self
+
+    async def start(self):
+        return self
+
+    async def launch(self, **kwargs):
+        browser = FakeBrowser(self.fail_new_page)
+        self.browsers.append(browser)
+        return browser
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def playwright(monkeypatch):
+    fake = FakePlaywright()
+    monkeypatch.setattr(cdp_browser, 'async_playwright', lambda: fake)
+    return fake
+
+
+def test_pool_launches_once_and_closes_on_last_release(playwright):
+    pool = CDPBrowserPool()
+
+    async def run():
+        browsers = [await pool.acquire() for _ in range(3)]
+        assert len(playwright.browsers) == 1
+        assert all(browser is browsers[0] for browser in browsers)
+
+        await pool.release()
+        await pool.release()
+        assert browsers[0].is_connected()
+
+        await pool.release()
+        assert not browsers[0].is_connected()
+        assert playwright.stopped
+        assert pool.browser is None
+
+    asyncio.run(run())
+
+
+def test_pool_relaunches_after_disconnect(playwright):
+    pool = CDPBrowserPool()
+
+    async def run():
+        first = await pool.acquire()
+        first.connected = False
+        second = await pool.acquire()
+        assert second is not first
+        assert len(playwright.browsers) == 2
+        assert pool.users == 2
+
+    asyncio.run(run())
+
+
+def test_failed_page_setup_closes_context_and_releases_pool(monkeypatch):
+    fake = FakePlaywright(fail_new_page=True)
+    monkeypatch.setattr(cdp_browser, 'async_playwright', lambda: fake)
+    pool = CDPBrowserPool()
+    monkeypatch.setattr(cdp_browser, 'browser_pool', pool)
+    monitor = OfficialCDPMonitor(1, "https://www.popmart.com/sg/products/1/x", 3, 6, 300, 3)
+
+    assert not asyncio.run(monitor.setup_driver())
+    assert fake.browsers[0].contexts[0].closed
+    assert monitor.browser_context is None
+    assert pool.users == 0
+
+
+def test_to_playwright_selector():
+    monitor = OfficialCDPMonitor(1, "https://www.popmart.com/sg/products/1/x", 3, 6, 300, 3)
+    assert monitor.to_playwright_selector(By.XPATH, "//button") == "xpath=//button"
+    assert monitor.to_playwright_selector(By.CSS_SELECTOR, ".btn-buy") == ".btn-buy"
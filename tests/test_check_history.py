@@ -0,0 +1,58 @@
+import pytest
+import time
+from monitors.check_history import (CheckHistory, percentile, ERROR_NONE, ERROR_TIMEOUT,
+                                    STATE_SOLD_OUT, STATE_IN_STOCK, STATE_UNKNOWN)
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.9) == 90
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.99) == 7
+    assert percentile([], 0.5) is None
+
+
+def test_ring_buffer_overwrites_oldest():
+    history = CheckHistory(capacity=3)
+    now = time.time()
+    for i in range(5):
+        history.record(now + i, float(i), STATE_SOLD_OUT, ERROR_NONE)
+
+    assert len(history) == 3
+    assert [record.duration for record in history.records()] == [2.0, 3.0, 4.0]
+    assert history.latest().duration == 4.0
+
+
+def test_empty_history():
+    history = CheckHistory(capacity=4)
+    assert history.latest() is None
+    summary = history.summary()
+    assert summary['checks'] == 0
+    assert summary['success_rate'] is None
+    assert summary['latency']['p50'] is None
+
+
+def test_summary_window_errors_and_timeline():
+    history = CheckHistory(capacity=8)
+    now = time.time()
+    # 超出统计窗口的旧记录
+    history.record(now - 7200, 9.0, STATE_IN_STOCK, ERROR_NONE)
+    history.record(now - 30, 1.0, STATE_SOLD_OUT, ERROR_NONE)
+    history.record(now - 20, 2.0, STATE_SOLD_OUT, ERROR_NONE)
+    history.record(now - 10, 3.0, STATE_UNKNOWN, ERROR_TIMEOUT)
+    history.record(now, 4.0, STATE_IN_STOCK, ERROR_NONE)
+
+    summary = history.summary(window=3600)
+    assert summary['checks'] == 4
+    assert summary['errors'] == {'timeout': 1}
+    assert summary['success_rate'] == 0.75
+    assert summary['in_stock_ratio'] == 0.25
+    assert summary['latency'] == {'p50': 2.0, 'p90': 4.0, 'p99': 4.0, 'max': 4.0}
+    assert [entry['state'] for entry in summary['timeline']] == [
+        'sold_out', 'unknown', 'in_stock']
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        CheckHistory(capacity=0)
@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from monitors import circuit_breaker
+from monitors.base_monitor import BaseMonitor
+from monitors.check_history import ERROR_NONE, ERROR_TIMEOUT, ERROR_PAGE_INVALID, ERROR_UNKNOWN
+from monitors.circuit_breaker import (CircuitBreaker, STATE_CLOSED, STATE_OPEN,
+                                      STATE_HALF_OPEN)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的单调时钟"""
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_trips_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30)
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert breaker.current_cooldown == 30
+    assert not breaker.allow_request()
+    assert breaker.remaining_cooldown() == 30
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    assert not breaker.record_success()
+    assert not breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+
+
+def test_half_open_after_cooldown_and_recovers_on_success(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow_request()
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.trip_count == 0
+
+
+def test_failed_probe_doubles_cooldown_up_to_max(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30, max_cooldown=100)
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.current_cooldown == 30
+
+    # 半开状态下一次失败即再次熔断
+    clock[0] += 30
+    assert breaker.allow_request()
+    assert breaker.record_failure()
+    assert breaker.current_cooldown == 60
+
+    clock[0] += 60
+    breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.current_cooldown == 100
+    assert breaker.get_status()['state'] == STATE_OPEN
+
+
+class ProbeMonitor(BaseMonitor):
+    """只用于更新熔断器的最小监控器"""
+
+    def __init__(self):
+        super().__init__("Test", 1, "https://www.popmart.com/sg/products/1/x", 3, 6, 300, 3,
+                         breaker_threshold=1, breaker_cooldown=30)
+        self.alerts = []
+
+    async def check_stock_and_notify(self, client):
+        return False
+
+    def extract_product_name_from_url(self, url):
+        return "X"
+
+    async def send_breaker_alert(self, client, product_name, tripped):
+        self.alerts.append(tripped)
+
+
+def test_only_successful_probe_closes_breaker(clock):
+    monitor = ProbeMonitor()
+    breaker = monitor.circuit_breaker
+
+    async def finish_check(error_code):
+        monitor.check_error = error_code
+        await monitor.update_circuit_breaker(None)
+
+    asyncio.run(finish_check(ERROR_TIMEOUT))
+    assert breaker.state == STATE_OPEN
+    assert monitor.alerts == [True]
+
+    # 试探时遇到拦截页面：不计入熔断，但也不算恢复
+    clock[0] += 30
+    assert breaker.allow_request()
+    asyncio.run(finish_check(ERROR_PAGE_INVALID))
+    assert breaker.state == STATE_HALF_OPEN
+    asyncio.run(finish_check(ERROR_UNKNOWN))
+    assert breaker.state == STATE_HALF_OPEN
+    assert monitor.alerts == [True]
+
+    asyncio.run(finish_check(ERROR_NONE))
+    assert breaker.state == STATE_CLOSED
+    assert monitor.alerts == [True, False]
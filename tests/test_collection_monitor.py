@@ -0,0 +1,103 @@
+import asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from monitors.collection_monitor import CollectionMonitor
+from monitors.status_server import StatusServer
+
+
+class FakeListingMonitor(CollectionMonitor):
+    """按顺序返回预设扫描结果的列表页监控器，不启动浏览器"""
+
+    def __init__(self, sweeps, **kwargs):
+        super().__init__(1, "https://www.popmart.com/sg/collection/11", 3, 6, 300, 3,
+                         page_load_wait=0, breaker_threshold=5, **kwargs)
+        self.sweeps = list(sweeps)
+        self.driver = object()
+
+    async def load_page(self, url):
+        pass
+
+    async def wait_for_page_ready(self, timeout):
+        pass
+
+    async def get_page_title(self):
+        return "POP MART"
+
+    async def execute_script(self, script):
+        return self.sweeps.pop(0)
+
+
+def card(spu_id, text):
+    return {'url': f"https://www.popmart.com/sg/products/{spu_id}/x", 'text': text}
+
+
+def run_check(listing):
+    async def check():
+        listing.check_error = 0
+        await listing.check_stock_and_notify(None)
+        await listing.update_circuit_breaker(None)
+    asyncio.run(check())
+
+
+def test_sweep_reports_changed_and_new_products():
+    sweeps_seen = []
+
+    async def on_sweep(listing, changed_ids, new_ids):
+        sweeps_seen.append((changed_ids, new_ids))
+
+    listing = FakeListingMonitor([
+        {'1': card(1, "LABUBU\nSOLD OUT"), '2': card(2, "ZIMOMO\nS$ 25")},
+        {'1': card(1, "LABUBU\nS$ 25"), '2': card(2, "ZIMOMO\nS$ 25"), '3': card(3, "NEW\nNotify me")},
+    ], on_sweep=on_sweep)
+
+    run_check(listing)
+    run_check(listing)
+
+    # 第一次扫描只建立基线
+    assert sweeps_seen == [([], []), (['1'], ['3'])]
+    assert listing.availability == {'1': True, '2': True, '3': False}
+
+
+def test_coverage_follows_latest_successful_sweep():
+    coverage_changes = []
+    listing = FakeListingMonitor([
+        {'1': card(1, "A"), '2': card(2, "B")},
+        {'1': card(1, "A")},
+        {},
+    ], on_coverage_change=lambda: coverage_changes.append(
+        set(listing.covered_product_ids())))
+
+    run_check(listing)
+    run_check(listing)
+    # 扫描失败（页面中没有商品）时不再覆盖任何商品
+    run_check(listing)
+
+    assert coverage_changes == [{'1', '2'}, {'1'}, set()]
+
+
+def test_open_breaker_covers_nothing():
+    listing = FakeListingMonitor([{'1': card(1, "A")}])
+    run_check(listing)
+    assert listing.covered_product_ids() == {'1'}
+
+    listing.circuit_breaker.trip()
+    assert listing.covered_product_ids() == set()
+
+
+def test_listing_status_has_path_safe_key_and_state():
+    listing = FakeListingMonitor([{'1': card(1, "A\nSOLD OUT"), '2': card(2, "B\nS$ 25")}])
+    assert listing.product_key == "listing-sg-collection-11"
+    run_check(listing)
+
+    async def fetch():
+        server = StatusServer(lambda: [listing])
+        app = web.Application()
+        app.router.add_get('/status/{product_key}', server.handle_product_status)
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get(f"/status/{listing.product_key}")
+            assert response.status == 200
+            return await response.json()
+
+    status = asyncio.run(fetch())
+    assert status['stock_state'] == 'in_stock'
+    assert status['listing'] == {'products': 2, 'available': 1, 'covered': 2}
@@ -0,0 +1,77 @@
+import pytest
+from monitors.config_loader import load_config_file
+
+
+DEFAULTS = {'min_interval': 3, 'max_interval': 6}
+
+
+def write_config(tmp_path, text):
+    path = tmp_path / 'monitor.toml'
+    path.write_text(text, encoding='utf-8')
+    return path
+
+
+def test_product_settings_override_global(tmp_path):
+    path = write_config(tmp_path, """
+[settings]
+min_interval = 5
+
+[[products]]
+url = "https://www.popmart.com/sg/products/1149/a"
+channel_id = 123
+
+[[products]]
+url = "https://www.popmart.com/sg/products/1150/b"
+channel_id = 123
+max_interval = 20
+
+[[listings]]
+url = "https://www.popmart.com/sg/collection/11"
+channel_id = 456
+auto_add = true
+""")
+    settings, products, listings = load_config_file(path, DEFAULTS)
+
+    assert settings == {'min_interval': 5, 'max_interval': 6}
+    assert products[0]['settings'] == {'min_interval': 5, 'max_interval': 6}
+    assert products[1]['settings'] == {'min_interval': 5, 'max_interval': 20}
+    assert products[0]['channel_id'] == 123
+    assert products[0]['auto_add'] is False
+    assert listings[0]['auto_add'] is True
+
+
+def test_webhook_only_entry_uses_webhook_as_channel(tmp_path):
+    path = write_config(tmp_path, """
+[[products]]
+url = "https://www.popmart.com/sg/products/1149/a"
+webhook_url = "https://discord.com/api/webhooks/1/token"
+""")
+    _, products, _ = load_config_file(path, DEFAULTS)
+    assert products[0]['channel_id'] == "https://discord.com/api/webhooks/1/token"
+
+
+def test_keyword_tables_are_keyed_by_lowercase_locale(tmp_path):
+    path = write_config(tmp_path, """
+[[products]]
+url = "https://www.popmart.com/jp/products/1149/a"
+channel_id = 1
+
+[keywords.JP]
+sold_out = ["売り切れ"]
+""")
+    _, products, _ = load_config_file(path, DEFAULTS)
+    assert products[0]['keyword_tables'] == {'jp': {'sold_out': ["売り切れ"]}}
+
+
+@pytest.mark.parametrize('text, message', [
+    ("[settings]\nunknown = 1\n", "未知的配置项"),
+    ("[[products]]\nchannel_id = 1\n", "缺少url"),
+    ("[[products]]\nurl = \"u\"\n", "缺少channel_id或webhook_url"),
+    ("[[products]]\nurl = \"u\"\nchannel_id = 1\n[[products]]\nurl = \"u\"\nchannel_id = 2\n", "URL重复"),
+    ("[keywords.jp]\nsoldout = [\"x\"]\n", "未知的关键词分类"),
+    ("[keywords.jp]\nsold_out = \"x\"\n", "必须为字符串列表"),
+])
+def test_invalid_config_raises(tmp_path, text, message):
+    path = write_config(tmp_path, text)
+    with pytest.raises(ValueError, match=message):
+        load_config_file(path, DEFAULTS)
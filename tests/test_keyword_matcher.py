@@ -0,0 +1,77 @@
+import random
+from monitors.keyword_matcher import (KeywordMatcher, build_product_matcher,
+                                      get_keyword_table, get_storefront_locale)
+
+
+def substring_hits(categories, text):
+    """逐个关键词子串查找（单次扫描分类器之前的判断方式），返回 {分类: {(位置, 关键词)}}"""
+    hits = {}
+    folded_text = text.lower()
+    for category, words in categories.items():
+        for word in words:
+            start = folded_text.find(word.lower())
+            while start >= 0:
+                hits.setdefault(category, set()).add((start, word))
+                start = folded_text.find(word.lower(), start + 1)
+    return hits
+
+
+def matcher_hits(matcher, text):
+    return {category: set(hits) for category, hits in matcher.scan(text).items()}
+
+
+def test_overlapping_keywords_are_all_found():
+    matcher = build_product_matcher(["Nowhere", "Labubu"])
+    assert set(matcher.scan("merbubuy now")) == {'buy', 'purchase'}
+    assert set(matcher.scan("BUY NOWHERE")) == {'buy', 'purchase', 'product'}
+
+    hits = matcher.scan("merbubuy now")
+    assert (5, 'BUY NOW') in hits['buy']
+    assert (5, 'BUY') in hits['purchase']
+
+
+def test_contained_keywords_count_for_their_category():
+    matcher = KeywordMatcher({'buy': ['BUY NOW'], 'purchase': ['BUY', 'NOW']})
+    assert matcher_hits(matcher, "buy now") == {
+        'buy': {(0, 'BUY NOW')},
+        'purchase': {(0, 'BUY'), (4, 'NOW')},
+    }
+
+
+def test_matches_substring_semantics_on_random_text():
+    categories = {
+        'sold_out': ['SOLD OUT', 'OUT OF STOCK'],
+        'unavailable': ['NOTIFY ME', 'COMING SOON'],
+        'buy': ['BUY NOW', 'ADD TO CART'],
+        'purchase': ['BUY', 'CART', 'PURCHASE'],
+        'product': ['Nowhere', 'merbu', 'bubu'],
+    }
+    matcher = KeywordMatcher(categories)
+    pieces = ['buy', 'now', 'here', 'sold', ' out', ' of stock', 'merbu', 'bu', 'cart',
+              'add to ', 'notify me', 'x', ' ', 'BUY NOW', 'OUT']
+    rng = random.Random(31)
+    for _ in range(500):
+        text = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+        assert matcher_hits(matcher, text) == substring_hits(categories, text), text
+
+
+def test_empty_matcher_and_text():
+    assert KeywordMatcher({}).scan("SOLD OUT") == {}
+    assert build_product_matcher([]).scan("") == {}
+
+
+def test_short_product_words_are_ignored():
+    matcher = build_product_matcher(["The", "Labubu"])
+    assert set(matcher.scan("the labubu")) == {'product'}
+    assert matcher.scan("the labubu")['product'] == [(4, 'Labubu')]
+
+
+def test_storefront_keyword_tables():
+    assert get_storefront_locale("https://www.popmart.com/JP/products/1") == 'jp'
+    assert get_storefront_locale("https://example.com/products/1") == 'default'
+
+    tables = {'default': {'buy': ['GET']}, 'jp': {'sold_out': ['売り切れ']}}
+    table = get_keyword_table('jp', tables)
+    assert table['sold_out'] == ['売り切れ']
+    assert table['buy'] == ['GET']
+    assert table['unavailable'] == ['NOTIFY ME', 'COMING SOON']
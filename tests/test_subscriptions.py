@@ -0,0 +1,102 @@
+import asyncio
+import time
+from monitors.subscriptions import SubscriptionRegistry, FanoutSender, get_product_key
+from monitors.official_monitor import OfficialMonitor
+
+
+def test_get_product_key():
+    assert get_product_key("https://www.popmart.com/sg/products/1149/LABUBU") == "1149"
+    assert get_product_key(" 1149 ") == "1149"
+
+
+def test_registry_round_trip(tmp_path):
+    path = str(tmp_path / 'subscriptions.json')
+    registry = SubscriptionRegistry(path)
+    assert registry.subscribe("1149", 10, role_id=5)
+    assert registry.subscribe("1149", 11)
+
+    reloaded = SubscriptionRegistry(path)
+    assert reloaded.get_subscribers("1149") == [
+        {'channel_id': 10, 'role_id': 5}, {'channel_id': 11, 'role_id': None}]
+    assert reloaded.get_channel_subscriptions(10) == [("1149", 5)]
+
+
+def test_subscribe_existing_channel_updates_role(tmp_path):
+    registry = SubscriptionRegistry(str(tmp_path / 'subscriptions.json'))
+    assert registry.subscribe("1149", 10, role_id=5)
+    assert not registry.subscribe("1149", 10, role_id=6)
+    assert registry.get_subscribers("1149") == [{'channel_id': 10, 'role_id': 6}]
+
+
+def test_unsubscribe_drops_empty_product(tmp_path):
+    path = str(tmp_path / 'subscriptions.json')
+    registry = SubscriptionRegistry(path)
+    registry.subscribe("1149", 10)
+    assert not registry.unsubscribe("1149", 11)
+    assert registry.unsubscribe("1149", 10)
+    assert "1149" not in registry.subscriptions
+    assert SubscriptionRegistry(path).subscriptions == {}
+
+
+def test_notification_targets_merge_mentions_per_channel(tmp_path):
+    registry = SubscriptionRegistry(str(tmp_path / 'subscriptions.json'))
+    registry.subscribe("1149", 1, role_id=5)
+    registry.subscribe("1149", 2)
+    registry.subscribe("1149", 3, role_id=7)
+    monitor = OfficialMonitor(1, "https://www.popmart.com/sg/products/1149/x", 3, 6, 300, 3)
+    assert monitor.get_notification_targets() == [(1, "@here")]
+
+    monitor.subscriptions = registry
+    assert monitor.get_notification_targets() == [
+        (1, "@here <@&5>"), (2, None), (3, "<@&7>")]
+
+
+class FakeChannel:
+    def __init__(self, client, channel_id):
+        self.client = client
+        self.channel_id = channel_id
+
+    async def send(self, content=None, embed=None):
+        client = self.client
+        client.active += 1
+        client.max_active = max(client.max_active, client.active)
+        client.sent.append((self.channel_id, content, time.monotonic()))
+        await asyncio.sleep(0.05)
+        client.active -= 1
+
+
+class FakeClient:
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.sent = []
+        self.active = 0
+        self.max_active = 0
+
+    def get_channel(self, channel_id):
+        if channel_id in self.missing:
+            return None
+        return FakeChannel(self, channel_id)
+
+
+def test_fanout_respects_concurrency_cap():
+    client = FakeClient(missing=[99])
+    sender = FanoutSender(max_concurrency=2, channel_interval=0)
+    targets = [(channel_id, None) for channel_id in range(6)] + [(99, None)]
+
+    sent_count = asyncio.run(sender.send(client, targets, embed=None))
+    assert sent_count == 6
+    assert client.max_active == 2
+
+
+def test_fanout_spaces_sends_to_the_same_channel():
+    client = FakeClient()
+    sender = FanoutSender(max_concurrency=5, channel_interval=0.3)
+
+    async def send_twice():
+        await asyncio.gather(sender.send(client, [(1, "a"), (2, "b")], embed=None),
+                             sender.send(client, [(1, "c")], embed=None))
+
+    asyncio.run(send_twice())
+    channel_one = [sent_at for channel_id, _, sent_at in client.sent if channel_id == 1]
+    assert len(channel_one) == 2
+    assert channel_one[1] - channel_one[0] >= 0.3
@@ -0,0 +1,86 @@
+import asyncio
+import time
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from monitors.webhook_notifier import WebhookNotifier
+
+
+def run_webhook(responses, notifier, sends=1):
+    """启动本地Webhook替身服务器，按顺序返回预设响应，返回 (发送结果, 请求时间列表)"""
+    request_times = []
+
+    async def handler(request):
+        await request.json()
+        request_times.append(time.monotonic())
+        status, body, headers = responses.pop(0) if responses else (204, None, {})
+        if body is None:
+            return web.Response(status=status, headers=headers)
+        return web.json_response(body, status=status, headers=headers)
+
+    async def main():
+        app = web.Application()
+        app.router.add_post('/hook', handler)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            url = str(server.make_url('/hook'))
+            return [await notifier.post(url, content="@here") for _ in range(sends)]
+        finally:
+            await notifier.close()
+            await server.close()
+
+    results = asyncio.run(main())
+    return results, request_times
+
+
+def test_success_sends_once():
+    results, times = run_webhook([(204, None, {})], WebhookNotifier())
+    assert results == [True]
+    assert len(times) == 1
+
+
+def test_429_waits_retry_after_then_retries():
+    results, times = run_webhook(
+        [(429, {'retry_after': 0.3}, {}), (204, None, {})], WebhookNotifier())
+    assert results == [True]
+    assert len(times) == 2
+    assert times[1] - times[0] >= 0.3
+
+
+def test_5xx_backs_off_then_retries():
+    results, times = run_webhook(
+        [(502, {'message': 'bad gateway'}, {}), (204, None, {})], WebhookNotifier())
+    assert results == [True]
+    assert len(times) == 2
+    # 第一次重试退避1秒
+    assert times[1] - times[0] >= 1
+
+
+def test_5xx_gives_up_after_max_retries():
+    results, times = run_webhook(
+        [(500, {}, {}), (500, {}, {})], WebhookNotifier(max_retries=1))
+    assert results == [False]
+    assert len(times) == 2
+
+
+def test_4xx_is_not_retried():
+    results, times = run_webhook(
+        [(404, {'message': 'Unknown Webhook'}, {}), (204, None, {})], WebhookNotifier())
+    assert results == [False]
+    assert len(times) == 1
+
+
+def test_exhausted_bucket_waits_for_reset():
+    headers = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset-After': '0.4'}
+    results, times = run_webhook(
+        [(204, None, headers), (204, None, {})], WebhookNotifier(), sends=2)
+    assert results == [True, True]
+    assert len(times) == 2
+    assert times[1] - times[0] >= 0.4
+
+
+def test_get_channel_only_for_registered_webhooks():
+    notifier = WebhookNotifier()
+    notifier.register(1, "https://discord.com/api/webhooks/1/token")
+    assert notifier.get_channel(1).webhook_url == "https://discord.com/api/webhooks/1/token"
+    assert notifier.get_channel(2) is None